@@ -5,21 +5,60 @@ Description: A Python/tkinter implementation of wordle.
 """
 
 # Imports
+import argparse
+import cProfile
+import datetime
 import random
-import tkinter as tk
-import tkinter.font as font
-from enum import Enum
+import sys
 import time
+from collections import deque
+from enum import Enum
+from game import GameState, GameError, shared_words
+from daily import get_schedule, NoDailyPuzzleError
+from feedback_table import CorruptTableError
+from solver import Solver, hints_built
+from remaining import RemainingAnswers
+from replay import GameLog, game_seed, choose_word
+from instrumentation import Timings, instrument
+import bulk
+
+# tkinter is imported by the first Wordy, so that this module, the game
+# rules and the bulk scorer can be imported without a display
+tk = None
+font = None
+
+
+def import_tkinter():
+    ''' Imports tkinter into this module the first time a window is made '''
+    global tk, font
+    if tk is None:
+        import tkinter
+        import tkinter.font
+        tk = tkinter
+        font = tkinter.font
 
 
 class Wordy:
-    def __init__(self):
-        """ Initialize the game """
+    def __init__(self, process_guess_waittime=1, log_filename=None, seed=None, timings=False,
+                 profile_filename=None):
+        """ Initialize the game. process_guess_waittime is the delay in seconds
+        between revealing successive letters of a guess, 0 reveals the row at once.
+        Every game is appended to log_filename if it is given, and seed makes the
+        sequence of random hidden words repeatable. If timings is true the game
+        loop methods are timed and the timings printed on quit, and if
+        profile_filename is given the session is profiled with cProfile and the
+        stats saved to that file on quit. The rules of every game are kept by a
+        game.GameState; Wordy only draws it. Call mainloop() to play. """
         # Constants
         self.WORD_SIZE = 5  # number of letters in the hidden word
-        self.NUM_GUESSES = 6  # number of guesses that the user gets
-        self.LONG_WORDLIST_FILENAME = "long_wordlist.txt"
-        self.SHORT_WORDLIST_FILENAME = "short_wordlist.txt"
+        self.MIN_WORD_SIZE = 2  # range of word lengths the player can choose
+        self.MAX_WORD_SIZE = 16  # from; boxes shrink so longer words still fit
+        self.SINGLE_BOARD_GUESSES = 6  # number of guesses that the user gets with one board,
+        self.NUM_GUESSES = self.SINGLE_BOARD_GUESSES  # every extra board adds one
+        self.MAX_BOARDS = 8  # hidden words that can be played at once, Quordle style.
+        # Every board adds a row to all of them, so 16 boards of 5 letters would leave
+        # boxes of 5 pixels in the guess canvas; 8 is the most that stays readable.
+        self.NUM_BOARDS = 1
 
         self.PADDING = 10
         self.SPECIFY_ENTRY_WIDTH = 5
@@ -27,8 +66,11 @@ class Wordy:
         self.started_game = False
         self.last_square = 0
 
-        self.words_list_short = []
-        self.words_list_long = []
+        self.words = None  # SharedWords of WORD_SIZE
+        self.words_list_short = ()
+        self.words_list_long = ()
+        self.words_set_short = frozenset()
+        self.words_set_long = frozenset()
 
         # Size of the frame that holds all guesses.  This is the upper left
         # frame in the window.
@@ -39,6 +81,7 @@ class Wordy:
         # A guess frame is an individual box that contains a guessed letter.
         self.GUESS_FRAME_SIZE = 50  # the width and height of the guess box.
         self.GUESS_FRAME_PADDING = 3
+        self.BOARD_PADDING = 10  # space between the grids of different boards
         self.GUESS_FRAME_BG_BEGIN = 'white'  # background color of a guess box
         # after the user enters the letter,
         # but before the guess is entered.
@@ -58,6 +101,10 @@ class Wordy:
         # and in the correct location.
         self.GUESS_FRAME_TEXT_AFTER = 'white'  # color of text in guess box after
         # the guess is entered.
+        # Background color of a guess box for each style passed to Color_Guess_Frame
+        self.GUESS_STYLE_BG = {1: self.GUESS_FRAME_BG_CORRECT_RIGHT_LOC,
+                               2: self.GUESS_FRAME_BG_CORRECT_WRONG_LOC,
+                               3: self.GUESS_FRAME_BG_WRONG}
         # Font to use for letters in the guess boxes.
         self.FONT_FAMILY = 'ariel'
         # Font size for letters in the guess boxes.
@@ -90,37 +137,83 @@ class Wordy:
         # Parameters for the control frame
         self.CONTROL_FRAME_HEIGHT = self.PARENT_GUESS_FRAME_HEIGHT + self.KEYBOARD_FRAME_HEIGHT
         self.CONTROL_FRAME_WIDTH = 300
+        # Width of the possible answers panel, to the right of the other control frames
+        self.ANSWERS_FRAME_WIDTH = 200
+        self.MAX_SHOWN_ANSWERS = 20  # possible answers listed in the panel
         # Horizontal padding on either side of the widgets in
         self.USER_SELECTION_PADDING = 10
         # the parameter frame.
 
         self.MESSAGE_DISPLAY_TIME_SECS = 5  # Length of time the message should be
         # displayed.
+        self.MESSAGE_MIN_DISPLAY_TIME_SECS = 1  # Length of time a message is shown
+        # at least before a queued message replaces it.
+        self.MAX_QUEUED_MESSAGES = 3  # Messages waiting to be shown; the oldest
+        # are dropped when more arrive.
         # When processing a guess (changing color
-        self.PROCESS_GUESS_WAITTIME = 1
+        self.PROCESS_GUESS_WAITTIME = process_guess_waittime
         # of the guess frames), time to wait between
         # updating successive frames.
 
-        self.previous_guesses = {}
-        self.incorrect_letters = {}
-        self.right_spots = {}
-        self.found_inconsistency = False
-
+        # Guess frames waiting to be coloured, as lists of (index, style) pairs
+        # coloured together, and the callbacks to run once the queue is empty.
+        self.reveal_queue = []
+        self.reveal_callbacks = []
+        self.reveal_job = None  # handle of the scheduled reveal step
+
+        # Messages waiting for the shown one to have been up long enough. Only
+        # one timer is ever pending for messages, whatever the number of calls.
+        self.message_queue = deque(maxlen=self.MAX_QUEUED_MESSAGES)
+        self.message_job = None  # handle of the timer that shows the next message or hides this one
+        self.message_shown_at = 0.0
+
+        self.game = None  # GameState of the current or last game
+        self.active_boards = [0]  # boards whose word has not been guessed, which receive typed letters
+
+        self.solver = None  # created the first time a hint is asked for
+        self.remaining = None  # possible answers of each board, created by the first game of a word size
+
+        self.rng = random.Random(seed)
+        self.game_seed = None  # seed the hidden word was picked with, None if specified
+        self.game_log = GameLog(log_filename) if log_filename is not None else None
+        self.game_id = None
+
+        # Methods timed when timings are on. Deliberate waits between revealed
+        # letters are added as "reveal_wait", so they are not mistaken for work.
+        self.TIMED_METHODS = ("button_handler", "enter", "process_guess", "check_word", "score_guess",
+                              "Color_Guess_Frame", "Color_Keyboard_Frame", "redraw_guesses",
+                              "load_words", "hint", "update_answers_panel")
+        self.timings = None  # Timings of this game, if timing is on
+        if timings:
+            self.timings = Timings()
+            # Before any widget is created, so button commands bind the timed methods
+            instrument(self, self.timings, self.TIMED_METHODS)
+        self.profiler = None
+        self.profile_filename = profile_filename
+        if profile_filename is not None:
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+
+        import_tkinter()
         self.window = tk.Tk()
         self.window.title("Wordy")
+        self.window.protocol("WM_DELETE_WINDOW", self.quit_game)
 
-        self.window.geometry("1050x700")
+        self.window.geometry("1250x700")
 
         self.setup_parent_guess_frame()
         self.setup_buttons_frame()
         self.setup_ride_parent_frame()
         self.setup_message_frame()
+        self.setup_answers_frame()
         self.setup_options_frame()
         self.setup_start_quit_frame()
 
         self.load_words()
 
-        tk.mainloop()
+    def mainloop(self):
+        ''' Runs the window until the game is quit '''
+        self.window.mainloop()
 
     def button_handler(self, key):
         if self.started_game:
@@ -128,22 +221,21 @@ class Wordy:
                 self.enter()
             elif key == "BACK":
                 if self.last_square > 0 and self.last_square > self.last_guess_index:
-                    self.Guess_label_list[self.last_square-1]['text'] = ""
+                    self.set_guess_letter(self.last_square-1, "")
                     self.last_square -= 1
                     if self.last_square == self.last_guess_index:
                         self.guess_finished = True
 
             else:
-                if self.last_square < len(self.Guess_label_list):
+                if self.last_square < self.NUM_GUESSES * self.WORD_SIZE:
                     if self.last_square > 1 and (self.last_square) % self.WORD_SIZE == 0 and not self.guess_finished:
                         return
                     self.guess_finished = False
-                    self.Guess_label_list[self.last_square]['text'] = key
+                    self.set_guess_letter(self.last_square, key)
                     self.last_square += 1
                     self.current_guess_row = (
                         self.last_square-1)//self.WORD_SIZE + 1
-             
-
+            self.update_answers_panel()
 
         else:
             return
@@ -153,143 +245,142 @@ class Wordy:
         # check if word in current guess row is 5 letters long
         if (self.last_square) % self.WORD_SIZE != 0:
             self.display_message("Word not finished")
-        elif self.last_square != 0:
-            word = ""
-            if self.guesses_must_be_words.get():
-                word = self.check_word()
-                if self.guess_finished:
-                    self.process_guess(word)
-            else:
-                word = self.create_word()
-                self.process_guess(word)
-            if word != None and not self.found_inconsistency:
-                self.guess_finished = True
-                self.last_guess_index = self.last_square
-            if word.lower() != self.hidden_word.get() and word != None and self.last_square == len(self.Guess_label_list):
-                self.display_message(
-                    f"Guesses used up. Word was {self.hidden_word.get()}. Game over.")
-
-    def check_word(self):
-        ''' Checks if entered word is valid guess, and returns the word if it is '''
-        # initialize word for the for loop
-        word = self.create_word()
-
-        # check if the word is a valid guess
-        if word.lower() not in self.words_list_long:
-            self.display_message("Word is not in word list")
+        elif self.last_square != self.last_guess_index:  # a row was typed since the last guess
+            self.process_guess(self.create_word())
 
+    def process_guess(self, word):
+        ''' Plays an entered guess and reveals its styles on every board it was scored on '''
+        try:
+            word = self.check_word(word)
+        except GameError as error:
+            # Not in the word list, or not consistent with the feedback so far in hard mode
+            self.display_message(str(error))
+            self.guess_finished = False
+            return
+        result = self.score_guess(word)
+        board_styles = result if self.game.boards is not None else {0: result}
+        if self.game_id is not None:
+            self.game_log.guess(self.game_id, word, result)
+        self.update_keyboard(self.game.changed_keys)
+        for board, styles in board_styles.items():
+            self.remaining.add(word, styles, board)
+        # Solved boards take no more letters
+        self.active_boards = self.game.active_boards()
+        self.show_hidden_words()  # evil mode may have re-picked the hidden word
+        self.last_guess_index = self.last_square
+        self.guess_finished = True
+        first_index = self.last_square - self.WORD_SIZE
+        if self.game.over:
+            # Stop accepting input right away, the message is shown once the row is revealed
+            self.started_game = False
+            self.reveal_rows(first_index, board_styles, self.Game_over)
         else:
-            # test passed
-            self.guess_finished = True
-            return word
+            self.reveal_rows(first_index, board_styles)
 
-    def process_guess(self, word):
-        hidden_word = self.hidden_word.get()
-        count = 0
-        if word == hidden_word:
-            for i in range(self.last_square - self.WORD_SIZE, self.last_square):
-                self.Color_Guess_Frame(i, 1)
-                time.sleep(self.PROCESS_GUESS_WAITTIME)
-                self.window.update()
-                self.Color_Keyboard_Frame(word[count], 1)
-                # time.sleep(self.PROCESS_GUESS_WAITTIME)
-                count += 1
-            self.Game_over()
+    def check_word(self, word):
+        ''' Returns the guess in lower case, raising GameError if the game does not accept it '''
+        return self.game.check(word)
+
+    def score_guess(self, word):
+        ''' Returns the styles of a checked guess, {board: styles} with more than one board '''
+        return self.game.play(word)
+
+    def reveal_rows(self, first_index, board_styles, on_done=None):
+        '''
+        Queues the guess frames starting at first_index of every board in board_styles,
+        given as {board: styles}, to be coloured one letter at a time. The same letter
+        is coloured on every board at once. The frames are coloured from the tk event
+        loop, so the window stays responsive.
+        '''
+        board_boxes = self.NUM_GUESSES * self.WORD_SIZE
+        for count in range(self.WORD_SIZE):
+            self.reveal_queue.append([(board*board_boxes + first_index + count, styles[count])
+                                      for board, styles in board_styles.items()])
+        if on_done is not None:
+            self.reveal_callbacks.append(on_done)
+        if self.PROCESS_GUESS_WAITTIME <= 0:
+            self.finish_reveal()
+        elif self.reveal_job is None:
+            self.reveal_next()
+
+    def reveal_next(self):
+        ''' Colours the next queued guess frames and schedules the ones after them '''
+        self.reveal_job = None
+        if self.reveal_queue:
+            for index, style in self.reveal_queue.pop(0):
+                self.Color_Guess_Frame(index, style)
+        if self.reveal_queue:
+            self.reveal_job = self.window.after(
+                int(self.PROCESS_GUESS_WAITTIME * 1000), self.reveal_next)
+            if self.timings is not None:
+                self.timings.add("reveal_wait", self.PROCESS_GUESS_WAITTIME)
         else:
-            finished_correct = False
-            correct_done = 0
-            letter_instances = letter_instance_init(hidden_word)
-            letter_count = letter_counter(hidden_word)
-            unchecked_indeces = [index for index in range(self.last_square -self.WORD_SIZE, self.last_square)]
-            styles = []
-            temp_letters = []
-            for _ in range(self.WORD_SIZE):
-                styles.append(0)
-            for i in range(self.last_square - self.WORD_SIZE, self.last_square):
-                user_letter = word[count]
-                hidden_letter = hidden_word[count]
-                if user_letter == hidden_letter:
-                    #self.Color_Guess_Frame(i, 1)
-                    self.previous_guesses[user_letter+"#c"]=("correct",i%self.WORD_SIZE)
-                    self.right_spots[i%self.WORD_SIZE]=user_letter
-                    styles[count]=(i,1)
-                    self.Color_Keyboard_Frame(user_letter, 1)
-                    letter_instances[hidden_letter] = letter_instances.get(hidden_letter,0) + 1
-                    unchecked_indeces.remove(i)
-                    hidden_word = replace(hidden_word, "#", count)
-                elif user_letter not in hidden_word:
-                    #self.Color_Guess_Frame(i, 3)
-                    if self.hard_mode.get():
-                        if (self.incorrect_letters.get(user_letter,0)==1 and self.last_square>self.WORD_SIZE) or self.right_spots.get(count, None) != None:
-                            self.display_message(f"{word} is not consistent with previous guesses1.")
-                            self.guess_finished = False
-                            self.found_inconsistency = True
-                            self.remove_guesses(temp_letters)
-                            return
-                    self.incorrect_letters[user_letter]=1
-                    temp_letters.append(user_letter)
-                    styles[count]=(i,3)
-                    self.Color_Keyboard_Frame(user_letter, 3)
-                    unchecked_indeces.remove(i)
-                
-                count += 1
-
-            temp_count = count-self.WORD_SIZE
-            for index in unchecked_indeces:
-                letter = word[index%self.WORD_SIZE]
-
-                if letter in hidden_word:
-                    if letter_instances[letter]<letter_count[letter]:
-                        #self.Color_Guess_Frame(index, 2)
-                        styles[index%self.WORD_SIZE]=(index,2)
-                        if self.hard_mode.get():
-                            previous_data = self.previous_guesses.get(letter,0)
-                            if previous_data!=0:
-                                if index%self.WORD_SIZE in previous_data[1] and self.right_spots.get(index, None) == None:
-                                    self.display_message(f"{word} is not consistent with previous guesses2.")
-                                    self.guess_finished = False
-                                    self.found_inconsistency = True
-                                    if self.previous_guesses.get(letter,0) == 0:
-                                        self.previous_guesses[letter] = ("incorrect",[index%self.WORD_SIZE])
-                                    else:
-                                        self.previous_guesses[letter][1].append(index%self.WORD_SIZE)
-                                    return
-                            else:
-                                if self.right_spots.get(index, None) == None and self.last_square>self.WORD_SIZE:
-                                    self.display_message(f"{word} is not consistent with previous guesses2.")
-                                    self.guess_finished = False
-                                    self.found_inconsistency = True
-                                    return
-                        self.Color_Keyboard_Frame(letter, 2)
-                else:
-                    #self.Color_Guess_Frame(index, 3)
-                    styles[index%self.WORD_SIZE]=(index,3)
-                    self.Color_Keyboard_Frame(letter, 3)
-            
-            for index,style in styles:
+            self.run_reveal_callbacks()
+
+    def finish_reveal(self):
+        ''' Cancels the animation and colours every queued guess frame immediately '''
+        self.cancel_reveal()
+        for frames in self.reveal_queue:
+            for index, style in frames:
                 self.Color_Guess_Frame(index, style)
-                time.sleep(self.PROCESS_GUESS_WAITTIME)
-                self.window.update()
+        self.reveal_queue = []
+        self.run_reveal_callbacks()
+
+    def cancel_reveal(self):
+        ''' Cancels the scheduled reveal step, leaving the queue untouched '''
+        if self.reveal_job is not None:
+            self.window.after_cancel(self.reveal_job)
+            self.reveal_job = None
 
-            self.last_guess_index=self.last_square
-            self.guess_finished = True
-            
+    def run_reveal_callbacks(self):
+        callbacks = self.reveal_callbacks
+        self.reveal_callbacks = []
+        for callback in callbacks:
+            callback()
 
     def Color_Guess_Frame(self, index, style):
-        self.Guess_label_list[index]['fg'] = self.GUESS_FRAME_TEXT_AFTER
-        if style == 1:
-            self.Guess_label_list[index]['bg'] = self.GUESS_FRAME_BG_CORRECT_RIGHT_LOC
-            self.Guess_frame_list[index]['bg'] = self.GUESS_FRAME_BG_CORRECT_RIGHT_LOC
-        elif style == 2:
-            self.Guess_label_list[index]['bg'] = self.GUESS_FRAME_BG_CORRECT_WRONG_LOC
-            self.Guess_frame_list[index]['bg'] = self.GUESS_FRAME_BG_CORRECT_WRONG_LOC
-        else:
-            self.Guess_label_list[index]['bg'] = self.GUESS_FRAME_BG_WRONG
-            self.Guess_frame_list[index]['bg'] = self.GUESS_FRAME_BG_WRONG
-        
-    def remove_guesses(self, items):
-        for item in items:
-            del self.incorrect_letters[item]
+        self.guess_styles[index] = style
+        self.mark_guess_dirty(index)
+
+    def set_guess_letter(self, index, letter):
+        ''' Types letter in box index of every board still being played '''
+        board_boxes = self.NUM_GUESSES * self.WORD_SIZE
+        for board in self.active_boards:
+            self.guess_letters[board*board_boxes + index] = letter
+            self.mark_guess_dirty(board*board_boxes + index)
+
+    def mark_guess_dirty(self, index):
+        ''' Remembers that a guess box changed and schedules one redraw for all changes '''
+        self.dirty_guesses.add(index)
+        if self.redraw_job is None:
+            self.redraw_job = self.window.after_idle(self.redraw_guesses)
+
+    def redraw_guesses(self):
+        '''
+        Updates the canvas items of the guess boxes that changed since the last redraw.
+        Items are only configured if their letter or colour is different from what is drawn.
+        '''
+        self.redraw_job = None
+        for index in self.dirty_guesses:
+            letter = self.guess_letters[index]
+            style = self.guess_styles[index]
+            drawn_letter, drawn_style = self.drawn_guesses[index]
+            if letter != drawn_letter:
+                self.guess_canvas.itemconfigure(self.guess_texts[index], text=letter)
+            if style != drawn_style:
+                if style == 0:
+                    self.guess_canvas.itemconfigure(self.guess_boxes[index], fill=self.GUESS_FRAME_BG_BEGIN)
+                    self.guess_canvas.itemconfigure(self.guess_texts[index], fill=self.GUESS_FRAME_TEXT_BEGIN)
+                else:
+                    self.guess_canvas.itemconfigure(self.guess_boxes[index], fill=self.GUESS_STYLE_BG[style])
+                    self.guess_canvas.itemconfigure(self.guess_texts[index], fill=self.GUESS_FRAME_TEXT_AFTER)
+            self.drawn_guesses[index] = (letter, style)
+        self.dirty_guesses = set()
+
+    def update_keyboard(self, changed):
+        ''' Colours the keys whose best style changed, given as {letter: style} '''
+        for letter, style in changed.items():
+            self.Color_Keyboard_Frame(letter, style)
 
     def Color_Keyboard_Frame(self, letter, style):
         letter = letter.upper()
@@ -300,16 +391,79 @@ class Wordy:
         else:
             self.buttons[letter]['fg'] = self.KEYBOARD_BUTTON_BG_WRONG
 
+    def update_answers_panel(self):
+        '''
+        Shows how many answers are still possible on each board and lists the first
+        of them, narrowed to the letters typed so far on the current row.
+        '''
+        if self.remaining is None:
+            return
+        prefix = self.create_prefix()
+        counts = []
+        shown = []
+        for board in self.active_boards:
+            matching = self.remaining.matching(prefix, board)
+            if self.game.boards is None:
+                counts.append(f"{self.remaining.count(matching)} possible answers")
+            else:
+                counts.append(f"Board {board + 1}: {self.remaining.count(matching)}")
+            if not shown:
+                shown = self.remaining.words(matching, self.MAX_SHOWN_ANSWERS)
+        self.answers_count_variable.set("\n".join(counts))
+        self.answers_variable.set("\n".join(shown))
+
+    def hint(self):
+        ''' Displays the best next guess according to the solver '''
+        if not self.started_game:
+            self.display_message("Start a game to get a hint")
+            return
+        if self.game.boards is not None:
+            self.display_message("Hints play one board")
+            return
+        if self.solver is None:
+            # Only loads a prebuilt table and ranking, building them would freeze the window
+            if not hints_built(self.WORD_SIZE):
+                self.display_message(f"Hints need the precomputed table, run python solver.py {self.WORD_SIZE}")
+                return
+            self.solver = Solver(self.WORD_SIZE)
+        # Only the guesses made since the last hint need to be applied
+        for word, styles in self.game.guesses[len(self.solver.history):]:
+            self.solver.update(word, styles)
+        guess = self.solver.best_guess(self.game.hard_mode)
+        if guess is None:
+            self.display_message("No hint available")
+        else:
+            self.display_message(f"Hint: try {guess.upper()}")
+
+    def log_game_end(self, won):
+        if self.game_id is not None:
+            self.game_log.end_game(self.game_id, won)
+
     def Game_over(self):
-        self.display_message("Correct. Nice Job. Game Over")
+        self.display_message(self.game.message())
+        self.log_game_end(self.game.won)
         self.started_game = False
+        self.set_options_state("normal")
 
     def create_word(self):
         word = ""
-        for i in range(self.last_square-self.WORD_SIZE, self.last_square):
-            word += self.Guess_label_list[i].cget("text").lower()
+        # Every active board holds the same letters
+        first_box = self.active_boards[0] * self.NUM_GUESSES * self.WORD_SIZE
+        for i in range(first_box + self.last_square-self.WORD_SIZE, first_box + self.last_square):
+            word += self.guess_letters[i].lower()
         return word
 
+    def create_prefix(self):
+        ''' Returns the letters typed so far on the current row '''
+        if not self.active_boards:
+            return ""
+        first_box = self.active_boards[0] * self.NUM_GUESSES * self.WORD_SIZE
+        return "".join(self.guess_letters[first_box + self.last_guess_index:first_box + self.last_square]).lower()
+
+    def show_hidden_words(self):
+        ''' Puts the hidden words of the game in the label Show Word shows '''
+        self.hidden_word.set(" ".join(self.game.hidden_words()))
+
     def show_hide_word(self):
         ''' 
         Shows/Hides the hidden word
@@ -322,68 +476,213 @@ class Wordy:
 
     def display_message(self, message):
         ''' 
-        Displays the message in the message frame and schedules an event 5 seconds in the future to hide the message
+        Displays the message in the message frame for MESSAGE_DISPLAY_TIME_SECS.
+        If another message is showing, the new one is queued and replaces it once
+        the shown one has been up for MESSAGE_MIN_DISPLAY_TIME_SECS. Repeats of the
+        shown or last queued message only restart the timer.
         '''
+        if self.message_job is None:
+            self.show_message(message)
+        elif self.message_queue:
+            if self.message_queue[-1] != message:
+                self.message_queue.append(message)
+        elif message == self.message_variable.get():
+            self.show_message(message)
+        else:
+            self.message_queue.append(message)
+            # The shown message may now only stay up for its minimum time
+            remaining = self.MESSAGE_MIN_DISPLAY_TIME_SECS - (time.monotonic() - self.message_shown_at)
+            self.schedule_message_timer(max(0, remaining))
+
+    def show_message(self, message):
+        ''' Shows message now, until the next queued message or for MESSAGE_DISPLAY_TIME_SECS '''
         self.message_variable.set(message)
-        # Schedule the hide message event (5 secs after)
-        self.window.after(self.MESSAGE_DISPLAY_TIME_SECS *
-                          1000, self.hide_message)
+        self.message_shown_at = time.monotonic()
+        if self.message_queue:
+            self.schedule_message_timer(self.MESSAGE_MIN_DISPLAY_TIME_SECS)
+        else:
+            self.schedule_message_timer(self.MESSAGE_DISPLAY_TIME_SECS)
+
+    def schedule_message_timer(self, seconds):
+        ''' Replaces the pending message timer with one firing after seconds '''
+        self.cancel_message_timer()
+        self.message_job = self.window.after(int(seconds * 1000), self.next_message)
+
+    def cancel_message_timer(self):
+        if self.message_job is not None:
+            self.window.after_cancel(self.message_job)
+            self.message_job = None
+
+    def next_message(self):
+        ''' Shows the next queued message, or hides the message if none is queued '''
+        self.message_job = None
+        if self.message_queue:
+            self.show_message(self.message_queue.popleft())
+        else:
+            self.hide_message()
 
     def hide_message(self):
         ''' 
         Hides the message in the message frame
         '''
+        self.cancel_message_timer()
+        self.message_queue.clear()
         self.message_variable.set("")
 
     def start_game(self):
-        if not self.specify_word.get():  # user did not specify word
-            self.hidden_word.set(random.choice(self.words_list_short))
-        else:  # user specified word
-            word = self.specify_word_entry.get().lower()
-            if len(word) != self.WORD_SIZE:  # specified word is not of correct length
-                self.display_message("Incorrect specified word length")
+        try:
+            word_size = self.word_size_var.get()
+        except tk.TclError:  # word length box does not hold a number
+            word_size = 0
+        if word_size < self.MIN_WORD_SIZE or word_size > self.MAX_WORD_SIZE:
+            self.display_message(
+                f"Word length must be between {self.MIN_WORD_SIZE} and {self.MAX_WORD_SIZE}")
+            return
+        try:
+            num_boards = self.num_boards_var.get()
+        except tk.TclError:
+            num_boards = 0
+        if num_boards < 1 or num_boards > self.MAX_BOARDS:
+            self.display_message(f"Boards must be between 1 and {self.MAX_BOARDS}")
+            return
+        if num_boards != self.NUM_BOARDS:
+            self.set_num_boards(num_boards)
+        if word_size != self.WORD_SIZE:
+            self.set_word_size(word_size)
+        if self.words is None:  # the word lists could not be loaded
+            return
+
+        word = None
+        self.game_seed = None
+        if self.specify_word.get():  # user specified word
+            word = self.specify_word_entry.get()
+        elif self.daily_puzzle.get():
+            if self.NUM_BOARDS > 1:
+                self.display_message("The daily puzzle plays one board")
                 return
-            else:  # specified word is of correct length
-                if self.guesses_must_be_words.get():  # guess only words enabled
-                    # word is valid (Changed to short list)
-                    if word in self.words_list_short:
-                        self.hidden_word.set(self.specify_word_entry.get())
-                    else:  # word is invalid
-                        self.display_message("Specified word not a valid word")
-                        return
-                self.hidden_word.set(self.specify_word_entry.get())
+            try:
+                # Only loads a prebuilt index, building one would freeze the window
+                word = get_schedule(self.WORD_SIZE).word(datetime.date.today())
+            except (NoDailyPuzzleError, CorruptTableError) as error:
+                self.display_message(str(error))
+                return
+        elif self.NUM_BOARDS == 1 and self.words_list_short:
+            self.game_seed = game_seed(self.rng)
+            word = choose_word(self.game_seed, self.words_list_short)
+        game = GameState(self.words, self.NUM_GUESSES, self.hard_mode.get(), self.guesses_must_be_words.get(),
+                         self.evil_mode.get(), self.NUM_BOARDS)
+        try:
+            game.start(word, self.rng)
+        except GameError as error:
+            self.display_message(str(error))
+            return
+        self.game = game
+        self.show_hidden_words()
         self.started_game = True
+        if self.solver is not None:
+            self.solver.reset()
+        if self.last_square > 0:  # board still shows the previous game
+            self.reset_board()
+        self.active_boards = self.game.active_boards()
+        if self.remaining is None:
+            self.remaining = RemainingAnswers(self.words_list_short, self.WORD_SIZE, self.NUM_BOARDS)
+        else:
+            self.remaining.reset(self.NUM_BOARDS)
+        self.update_answers_panel()
+        self.game_id = None
+        # The log holds one hidden word per game, so games with more boards are not logged
+        if self.game_log is not None and self.game.boards is None:
+            self.game_id = self.game_log.start_game(
+                self.game.hidden_word, self.WORD_SIZE, self.NUM_GUESSES, self.game.hard_mode,
+                self.game.guesses_must_be_words, self.game_seed, evil=self.game.evil)
 
         # Since we return whenever we find an error, the code below is only going to be executed if the game started
-        self.hard_mode_check["state"] = "disabled"
-        self.guesses_must_be_words_check["state"] = "disabled"
-        self.specify_word_check["state"] = "disabled"
-        self.specify_word_entry["state"] = "disabled"
+        self.set_options_state("disabled")
+
+    def set_options_state(self, state):
+        ''' Enables ("normal") or disables ("disabled") the game options '''
+        self.hard_mode_check["state"] = state
+        self.guesses_must_be_words_check["state"] = state
+        self.specify_word_check["state"] = state
+        self.specify_word_entry["state"] = state
+        self.word_size_spinbox["state"] = state
+        self.evil_mode_check["state"] = state
+        self.daily_puzzle_check["state"] = state
+        self.num_boards_spinbox["state"] = state
+
+    def set_word_size(self, word_size):
+        '''
+        Switches the game to words of word_size letters. The word lists are
+        already in memory, so only the lists of that size are looked up.
+        '''
+        self.WORD_SIZE = word_size
+        self.load_words()
+        self.solver = None  # the solver's tables are for the old size
+        self.remaining = None
+        self.reset_board()
+
+    def set_num_boards(self, num_boards):
+        ''' Switches the game to num_boards hidden words, with one more guess for every extra board '''
+        self.NUM_BOARDS = num_boards
+        self.NUM_GUESSES = self.SINGLE_BOARD_GUESSES + num_boards - 1
+        self.reset_board()
+
+    def reset_board(self):
+        ''' Rebuilds an empty guess grid for the current WORD_SIZE and clears the keyboard colours '''
+        self.cancel_reveal()
+        self.reveal_queue = []
+        self.reveal_callbacks = []
+        if self.redraw_job is not None:
+            self.window.after_cancel(self.redraw_job)
+            self.redraw_job = None
+        self.guess_canvas.delete("all")
+        self.last_square = 0
+        self.last_guess_index = 0
+        self.current_guess_row = 1
+        self.guess_finished = False
+        self.active_boards = list(range(self.NUM_BOARDS))
+
+        self.create_guesses_frames()
+
+        for button in self.buttons.values():
+            button['fg'] = self.KEYBOARD_BUTTON_TEXT_BEGIN
 
     def quit_game(self):
         ''' 
         Quits the program
         '''
+        self.cancel_reveal()
+        self.cancel_message_timer()
+        if self.redraw_job is not None:
+            self.window.after_cancel(self.redraw_job)
+        if self.game_log is not None:
+            self.game_log.close()
+        self.dump_instrumentation()
         self.window.destroy()
 
+    def dump_instrumentation(self):
+        ''' Prints the timings and saves the profile of the session, if they are on '''
+        if self.timings is not None:
+            print(self.timings.format())
+        if self.profiler is not None:
+            self.profiler.disable()
+            self.profiler.dump_stats(self.profile_filename)
+            self.profiler = None
+
     def load_words(self):
         ''' 
-        Loads the words from the files long_wordlist.txt and short_wordlist.txt into lists
+        Loads the words of size WORD_SIZE from the files long_wordlist.txt and short_wordlist.txt.
+        The files are read once per process and shared between games.
         '''
         try:
-            file_long = open(self.LONG_WORDLIST_FILENAME, "r")
-            file_short = open(self.SHORT_WORDLIST_FILENAME, "r")
-
-            for line in file_long:
-                line = line.strip()
-                if len(line) == self.WORD_SIZE:
-                    self.words_list_long.append(line)
-
-            for line in file_short:
-                line = line.strip()
-                if len(line) == self.WORD_SIZE:
-                    self.words_list_short.append(line)
+            self.words = shared_words(self.WORD_SIZE)
+
+            self.words_list_long = self.words.guesses
+            self.words_set_long = self.words.guess_set
+            self.words_list_short = self.words.answers
+            self.words_set_short = self.words.answer_set
         except FileNotFoundError:
+            self.words = None
             print(
                 "Couldn't load words from file/s. Try again or check that the files exist")
 
@@ -400,8 +699,11 @@ class Wordy:
         # trying to display text
         self.font = font.Font(family=self.FONT_FAMILY,
                               size=self.FONT_SIZE_GUESS)
-        self.Guess_label_list = []
-        self.Guess_frame_list = []
+        # All guess boxes are drawn as items on one canvas
+        self.guess_canvas = tk.Canvas(self.parent_guess_frame, width=self.PARENT_GUESS_FRAME_WIDTH,
+                                      height=self.PARENT_GUESS_FRAME_HEIGHT, highlightthickness=0)
+        self.guess_canvas.grid(row=0, column=0)
+        self.redraw_job = None
 
         self.last_guess_index = 0
 
@@ -409,32 +711,52 @@ class Wordy:
 
         self.create_guesses_frames()
 
-        self.parent_guess_frame.grid_columnconfigure(0, weight=2)
-        self.parent_guess_frame.grid_columnconfigure(
-            self.WORD_SIZE+1, weight=2)
-
-        self.parent_guess_frame.grid_rowconfigure(0, weight=2)
-        self.parent_guess_frame.grid_rowconfigure(self.NUM_GUESSES+1, weight=2)
-
         ''' End of Parent Guess Frame'''
 
     def create_guesses_frames(self):
-        for r in range(1, self.NUM_GUESSES+1):
-            for c in range(1, self.WORD_SIZE+1):
-                frame = tk.Frame(self.parent_guess_frame, height=self.GUESS_FRAME_SIZE, width=self.GUESS_FRAME_SIZE,
-                                 background=self.GUESS_FRAME_BG_BEGIN, borderwidth=1, relief="solid")
-                frame.grid_propagate(False)
-                frame.grid(row=r, column=c, padx=self.GUESS_FRAME_PADDING,
-                           pady=self.GUESS_FRAME_PADDING)
-                frame.grid_rowconfigure(0, weight=1)
-                frame.grid_columnconfigure(0, weight=1)
-                self.Guess_frame_list.append(frame)
-
-                label = tk.Label(frame, background=self.GUESS_FRAME_BG_BEGIN,
-                                 fg=self.GUESS_FRAME_TEXT_BEGIN, font=self.font)
-                label.grid_propagate(False)
-                label.grid(row=0, column=0, sticky="")
-                self.Guess_label_list.append(label)
+        '''
+        Creates a box and a letter item on the guess canvas for every letter of every guess
+        of every board. Box index board*NUM_GUESSES*WORD_SIZE + row*WORD_SIZE + column holds
+        a letter of a board. Boxes shrink when the boards would not fit at GUESS_FRAME_SIZE.
+        '''
+        # Lay the boards out in the number of columns that gives the largest boxes
+        best = None
+        for columns in range(1, self.NUM_BOARDS + 1):
+            rows = -(-self.NUM_BOARDS // columns)
+            width = (self.PARENT_GUESS_FRAME_WIDTH - (columns - 1)*self.BOARD_PADDING) // columns
+            height = (self.PARENT_GUESS_FRAME_HEIGHT - (rows - 1)*self.BOARD_PADDING) // rows
+            step = min(self.GUESS_FRAME_SIZE + 2*self.GUESS_FRAME_PADDING,
+                       width // self.WORD_SIZE, height // self.NUM_GUESSES)
+            if best is None or step > best[0]:
+                best = (step, columns, rows)
+        step, columns, rows = best
+        size = step - 2*self.GUESS_FRAME_PADDING
+        self.font.configure(size=max(1, self.FONT_SIZE_GUESS * size // self.GUESS_FRAME_SIZE))
+        board_width = step*self.WORD_SIZE + self.BOARD_PADDING
+        board_height = step*self.NUM_GUESSES + self.BOARD_PADDING
+        # Center the grids in the canvas
+        left = (self.PARENT_GUESS_FRAME_WIDTH - board_width*columns + self.BOARD_PADDING) // 2 + self.GUESS_FRAME_PADDING
+        top = (self.PARENT_GUESS_FRAME_HEIGHT - board_height*rows + self.BOARD_PADDING) // 2 + self.GUESS_FRAME_PADDING
+
+        self.guess_boxes = []
+        self.guess_texts = []
+        for board in range(self.NUM_BOARDS):
+            board_left = left + (board % columns)*board_width
+            board_top = top + (board // columns)*board_height
+            for r in range(self.NUM_GUESSES):
+                for c in range(self.WORD_SIZE):
+                    x = board_left + c*step
+                    y = board_top + r*step
+                    self.guess_boxes.append(self.guess_canvas.create_rectangle(
+                        x, y, x + size, y + size, fill=self.GUESS_FRAME_BG_BEGIN, outline="black"))
+                    self.guess_texts.append(self.guess_canvas.create_text(
+                        x + size//2, y + size//2, text="", fill=self.GUESS_FRAME_TEXT_BEGIN, font=self.font))
+
+        num_boxes = self.NUM_BOARDS * self.NUM_GUESSES * self.WORD_SIZE
+        self.guess_letters = [""] * num_boxes  # letter in each box
+        self.guess_styles = [0] * num_boxes  # style of each box, 0 until the guess is entered
+        self.drawn_guesses = [("", 0)] * num_boxes  # (letter, style) currently on the canvas
+        self.dirty_guesses = set()
 
     def setup_buttons_frame(self):
         ''' Start of buttons frame '''
@@ -494,7 +816,8 @@ class Wordy:
     def setup_ride_parent_frame(self):
         ''' Right side frames'''
         self.control_frame = tk.Frame(self.window, height=self.CONTROL_FRAME_HEIGHT,
-                                      width=self.CONTROL_FRAME_WIDTH, borderwidth=1, relief="solid")
+                                      width=self.CONTROL_FRAME_WIDTH + self.ANSWERS_FRAME_WIDTH,
+                                      borderwidth=1, relief="solid")
         self.control_frame.grid_propagate(False)
         self.control_frame.grid(row=0, column=1, rowspan=2)
 
@@ -519,6 +842,26 @@ class Wordy:
 
         ''' End of results/message frame'''
 
+    def setup_answers_frame(self):
+        ''' Start of possible answers frame '''
+        self.answers_frame = tk.Frame(self.control_frame, height=self.CONTROL_FRAME_HEIGHT,
+                                      width=self.ANSWERS_FRAME_WIDTH, borderwidth=1, relief="solid")
+        self.answers_frame.grid_propagate(False)
+        self.answers_frame.grid(row=0, column=1, rowspan=3)
+
+        self.answers_count_variable = tk.StringVar()
+        self.answers_variable = tk.StringVar()
+
+        self.answers_count_label = tk.Label(
+            self.answers_frame, textvariable=self.answers_count_variable, justify="left")
+        self.answers_count_label.grid(row=0, column=0, sticky="W", padx=self.PADDING)
+
+        self.answers_label = tk.Label(
+            self.answers_frame, textvariable=self.answers_variable, justify="left")
+        self.answers_label.grid(row=1, column=0, sticky="W", padx=self.PADDING)
+
+        ''' End of possible answers frame '''
+
     def setup_options_frame(self):
         ''' Start of Options Frame '''
         self.options_Frame = tk.Frame(self.control_frame, height=self.CONTROL_FRAME_HEIGHT //
@@ -534,15 +877,25 @@ class Wordy:
         self.show_word.set(False)
         self.specify_word = tk.BooleanVar()
         self.specify_word.set(False)
+        self.evil_mode = tk.BooleanVar()
+        self.evil_mode.set(False)
+        self.daily_puzzle = tk.BooleanVar()
+        self.daily_puzzle.set(False)
 
         self.specified_word = tk.StringVar()
 
         self.hidden_word = tk.StringVar()
 
+        self.word_size_var = tk.IntVar()
+        self.word_size_var.set(self.WORD_SIZE)
+
+        self.num_boards_var = tk.IntVar()
+        self.num_boards_var.set(self.NUM_BOARDS)
+
         self.setup_option_widgets()
 
         self.options_Frame.grid_rowconfigure(0, weight=1)
-        self.options_Frame.grid_rowconfigure(5, weight=1)
+        self.options_Frame.grid_rowconfigure(9, weight=1)
 
         ''' End of Options Frame '''
 
@@ -576,6 +929,36 @@ class Wordy:
         self.specify_word_entry.grid(
             row=4, column=1, sticky="W", padx=self.PADDING)
 
+        self.word_size_label = tk.Label(self.options_Frame, text="Word length")
+        self.word_size_label.grid(
+            row=5, column=0, sticky="W", padx=self.PADDING)
+
+        self.word_size_spinbox = tk.Spinbox(
+            self.options_Frame, from_=self.MIN_WORD_SIZE, to=self.MAX_WORD_SIZE,
+            textvariable=self.word_size_var, width=self.SPECIFY_ENTRY_WIDTH)
+        self.word_size_spinbox.grid(
+            row=5, column=1, sticky="W", padx=self.PADDING)
+
+        self.evil_mode_check = tk.Checkbutton(
+            self.options_Frame, text="Evil mode", variable=self.evil_mode, onvalue=True, offvalue=False)
+        self.evil_mode_check.grid(
+            row=6, column=0, sticky="W", padx=self.PADDING)
+
+        self.num_boards_label = tk.Label(self.options_Frame, text="Boards")
+        self.num_boards_label.grid(
+            row=7, column=0, sticky="W", padx=self.PADDING)
+
+        self.num_boards_spinbox = tk.Spinbox(
+            self.options_Frame, from_=1, to=self.MAX_BOARDS,
+            textvariable=self.num_boards_var, width=self.SPECIFY_ENTRY_WIDTH)
+        self.num_boards_spinbox.grid(
+            row=7, column=1, sticky="W", padx=self.PADDING)
+
+        self.daily_puzzle_check = tk.Checkbutton(
+            self.options_Frame, text="Daily puzzle", variable=self.daily_puzzle, onvalue=True, offvalue=False)
+        self.daily_puzzle_check.grid(
+            row=8, column=0, sticky="W", padx=self.PADDING)
+
     def setup_start_quit_frame(self):
         ''' Start of start/quit frame '''
         self.start_quit_frame = tk.Frame(self.control_frame, height=self.CONTROL_FRAME_HEIGHT //
@@ -591,6 +974,10 @@ class Wordy:
             self.start_quit_frame, text="Quit", command=self.quit_game)
         self.quit_button.grid(row=1, column=2)
 
+        self.hint_button = tk.Button(
+            self.start_quit_frame, text="Hint", command=self.hint)
+        self.hint_button.grid(row=1, column=3)
+
         ''' End of start/quit frame '''
 
         # Centering widgets
@@ -599,36 +986,18 @@ class Wordy:
         self.start_quit_frame.grid_rowconfigure(2, weight=2)
 
         self.start_quit_frame.grid_columnconfigure(0, weight=2)
-        self.start_quit_frame.grid_columnconfigure(3, weight=2)
-
-def replace(s,ch,index):
-    ret_s = ""
-    if index>(len(s)+1):
-        raise BadReplacementIndexError
-    else:
-        for i in range(len(s)):
-            if i!=index:
-                ret_s+=s[i]
-            else:
-                ret_s+=ch
-    return ret_s
-
-def letter_counter(s):
-    count_dict = {}
-    for ch in s:
-        if ch not in count_dict:
-            count_dict[ch]=s.count(ch)
-    return count_dict
-
-def letter_instance_init(s):
-    instance_dict = {}
-    for ch in s:
-        if ch not in instance_dict:
-            instance_dict[ch]=0
-    return instance_dict
-
-class BadReplacementIndexError(Exception):
-    pass
+        self.start_quit_frame.grid_columnconfigure(4, weight=2)
 
 if __name__ == "__main__":
-    Wordy()
+    # "python Wordle.py score [files]" validates and scores guesses in bulk without the GUI
+    if len(sys.argv) > 1 and sys.argv[1] == "score":
+        bulk.main(sys.argv[2:])
+    else:
+        parser = argparse.ArgumentParser(description="Play Wordy")
+        parser.add_argument("--timings", action="store_true", help="time the game loop and print the timings on quit")
+        parser.add_argument("--profile", help="profile the session with cProfile and save the stats to this file")
+        parser.add_argument("--log", help="append every game to this log file for replay.py")
+        parser.add_argument("--seed", type=int, help="seed for the hidden words")
+        args = parser.parse_args()
+        Wordy(log_filename=args.log, seed=args.seed, timings=args.timings,
+              profile_filename=args.profile).mainloop()
@@ -0,0 +1,292 @@
+"""
+Description: Benchmarks for the Wordy engine hot paths. Runs without a
+display and reports the throughput and peak traced memory of word list
+loading, guess validation, scoring and solving over the shipped word
+lists. Results are saved as JSON so runs on different commits can be
+compared with --compare.
+"""
+
+import argparse
+import atexit
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import tempfile
+import time
+import tracemalloc
+
+import scoring
+import wordlists
+import wordpack
+from constraints import HardModeConstraints
+from letterindex import LetterIndex
+from remaining import RemainingAnswers
+from solver import Solver
+from wordlists import LONG_WORDLIST_FILENAME, SHORT_WORDLIST_FILENAME
+
+try:
+    import vectorized
+except ImportError:  # numpy is not installed
+    vectorized = None
+
+WORD_SIZE = 5
+SAMPLE_SIZE = 10000
+MIN_RUN_TIME = 0.5  # seconds each benchmark is repeated for
+SEED = 120
+
+# (name, setup) pairs. setup() returns (run, operations) where run() is
+# timed and operations is the number of operations one call performs.
+BENCHMARKS = []
+
+
+def benchmark(name):
+    def register(setup):
+        BENCHMARKS.append((name, setup))
+        return setup
+    return register
+
+
+def sample_pairs(count):
+    rng = random.Random(SEED)
+    guesses = wordlists.get_word_list(LONG_WORDLIST_FILENAME).words(WORD_SIZE)
+    answers = wordlists.get_word_list(SHORT_WORDLIST_FILENAME).words(WORD_SIZE)
+    return [(rng.choice(guesses), rng.choice(answers)) for _ in range(count)]
+
+
+@benchmark("load_words_cold_text")
+def bench_load_words_cold_text():
+    def run():
+        for filename in (LONG_WORDLIST_FILENAME, SHORT_WORDLIST_FILENAME):
+            word_list = wordlists.WordList(wordlists.read_words(filename))
+            word_list.word_set(WORD_SIZE)
+    return run, 2
+
+
+@benchmark("load_words_cold_packed")
+def bench_load_words_cold_packed():
+    directory = tempfile.mkdtemp()
+    atexit.register(shutil.rmtree, directory, True)
+    packed = [wordpack.compile_word_list(filename, os.path.join(directory, os.path.basename(filename) + ".pack"))
+              for filename in (LONG_WORDLIST_FILENAME, SHORT_WORDLIST_FILENAME)]
+
+    def run():
+        for filename in packed:
+            wordpack.PackedWordList(filename).word_set(WORD_SIZE)
+    return run, 2
+
+
+@benchmark("load_words_warm")
+def bench_load_words_warm():
+    wordlists.get_word_list(LONG_WORDLIST_FILENAME)
+    wordlists.get_word_list(SHORT_WORDLIST_FILENAME)
+
+    def run():
+        wordlists.get_word_list(LONG_WORDLIST_FILENAME).words(WORD_SIZE)
+        wordlists.get_word_list(SHORT_WORDLIST_FILENAME).words(WORD_SIZE)
+    return run, 2
+
+
+@benchmark("check_word")
+def bench_check_word():
+    word_set = wordlists.get_word_list(LONG_WORDLIST_FILENAME).word_set(WORD_SIZE)
+    rng = random.Random(SEED)
+    # Half valid guesses, half random letters, like Wordy.check_word sees them
+    words = [guess.upper() for guess, _ in sample_pairs(SAMPLE_SIZE // 2)]
+    words += ["".join(rng.choice("ABCDEFGHIJKLMNOPQRSTUVWXYZ") for _ in range(WORD_SIZE))
+              for _ in range(SAMPLE_SIZE // 2)]
+
+    def run():
+        for word in words:
+            word.lower() not in word_set
+    return run, len(words)
+
+
+@benchmark("score_guess")
+def bench_score_guess():
+    pairs = sample_pairs(SAMPLE_SIZE)
+
+    def run():
+        for guess, answer in pairs:
+            scoring.score_guess(guess, answer)
+    return run, len(pairs)
+
+
+@benchmark("letter_counter")
+def bench_letter_counter():
+    words = [answer for _, answer in sample_pairs(SAMPLE_SIZE)]
+
+    def run():
+        for word in words:
+            scoring.letter_counter(word)
+    return run, len(words)
+
+
+@benchmark("replace")
+def bench_replace():
+    words = [answer for _, answer in sample_pairs(SAMPLE_SIZE)]
+
+    def run():
+        for word in words:
+            scoring.replace(word, "#", 2)
+    return run, len(words)
+
+
+@benchmark("all_pairs_python")
+def bench_all_pairs_python():
+    # A slice of the guesses keeps a run short; throughput is per pair
+    guesses = wordlists.get_word_list(LONG_WORDLIST_FILENAME).words(WORD_SIZE)[:100]
+    answers = wordlists.get_word_list(SHORT_WORDLIST_FILENAME).words(WORD_SIZE)
+
+    def run():
+        for guess in guesses:
+            for answer in answers:
+                scoring.encode_pattern(scoring.score_guess(guess, answer))
+    return run, len(guesses) * len(answers)
+
+
+@benchmark("all_pairs_vectorized")
+def bench_all_pairs_vectorized():
+    if vectorized is None:
+        return None
+    guesses = vectorized.encode_words(wordlists.get_word_list(LONG_WORDLIST_FILENAME).words(WORD_SIZE))
+    answers = vectorized.encode_words(wordlists.get_word_list(SHORT_WORDLIST_FILENAME).words(WORD_SIZE))
+
+    def run():
+        vectorized.score_table(guesses, answers)
+    return run, len(guesses) * len(answers)
+
+
+@benchmark("hard_mode_filter")
+def bench_hard_mode_filter():
+    words = wordlists.get_word_list(LONG_WORDLIST_FILENAME).words(WORD_SIZE)
+    constraints = HardModeConstraints(WORD_SIZE)
+    constraints.add("crane", scoring.score_guess("crane", "there"))
+
+    def run():
+        constraints.filter(words)
+    return run, len(words)
+
+
+@benchmark("hard_mode_filter_index")
+def bench_hard_mode_filter_index():
+    words = wordlists.get_word_list(LONG_WORDLIST_FILENAME).words(WORD_SIZE)
+    index = LetterIndex(words, WORD_SIZE)
+    constraints = HardModeConstraints(WORD_SIZE)
+    constraints.add("crane", scoring.score_guess("crane", "there"))
+
+    def run():
+        index.filter(constraints)
+    return run, len(words)
+
+
+@benchmark("answers_prefix")
+def bench_answers_prefix():
+    answers = wordlists.get_word_list(SHORT_WORDLIST_FILENAME).words(WORD_SIZE)
+    remaining = RemainingAnswers(answers, WORD_SIZE)
+    remaining.add("crane", scoring.score_guess("crane", "there"))
+    # What the answers panel does on every keystroke of a row
+    prefixes = ["", "t", "th", "the", "ther", "there"]
+
+    def run():
+        for prefix in prefixes:
+            matching = remaining.matching(prefix)
+            remaining.count(matching)
+            remaining.words(matching, 20)
+    return run, len(prefixes)
+
+
+@benchmark("solver_second_move")
+def bench_solver_second_move():
+    solver = Solver(WORD_SIZE, trees={})  # time the search, not a saved tree
+    styles = scoring.score_guess("tares", "there")
+
+    def run():
+        solver.reset()
+        solver.update("tares", styles)
+        solver.best_guess()
+    return run, 1
+
+
+def measure(run, operations, min_run_time=MIN_RUN_TIME):
+    ''' Returns the best seconds per call and the peak traced memory of one call '''
+    tracemalloc.start()
+    run()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    best = float("inf")
+    calls = 0
+    started = time.perf_counter()
+    while calls == 0 or time.perf_counter() - started < min_run_time:
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+        calls += 1
+    return {
+        "seconds_per_call": best,
+        "ops_per_second": operations / best,
+        "operations": operations,
+        "calls": calls,
+        "peak_memory_bytes": peak,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def run_benchmarks(name_filter=None, min_run_time=MIN_RUN_TIME):
+    results = {}
+    for name, setup in BENCHMARKS:
+        if name_filter and name_filter not in name:
+            continue
+        benchmark_setup = setup()
+        if benchmark_setup is None:
+            print(f"{name:<26} skipped")
+            continue
+        results[name] = measure(*benchmark_setup, min_run_time=min_run_time)
+        print(f"{name:<26} {results[name]['ops_per_second']:>14,.0f} ops/s"
+              f" {results[name]['peak_memory_bytes'] / 1024:>10,.0f} KiB peak")
+    return {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": results,
+    }
+
+
+def compare(old, new):
+    ''' Prints the throughput change of every benchmark present in both runs '''
+    print(f"\nCompared with {old.get('commit')}:")
+    for name, result in new["results"].items():
+        if name in old["results"]:
+            ratio = result["ops_per_second"] / old["results"][name]["ops_per_second"]
+            print(f"{name:<26} {ratio:>8.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Wordy engine")
+    parser.add_argument("--output", default="benchmark_results.json", help="JSON file to write")
+    parser.add_argument("--filter", help="only run benchmarks whose name contains FILTER")
+    parser.add_argument("--compare", help="JSON file of an earlier run to compare against")
+    parser.add_argument("--min-time", type=float, default=MIN_RUN_TIME,
+                        help="seconds to repeat each benchmark for")
+    args = parser.parse_args()
+
+    report = run_benchmarks(args.filter, args.min_time)
+    with open(args.output, "w") as file:
+        json.dump(report, file, indent=2)
+    if args.compare:
+        with open(args.compare, "r") as file:
+            compare(json.load(file), report)
+
+
+if __name__ == "__main__":
+    main()
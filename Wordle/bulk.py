@@ -0,0 +1,122 @@
+"""
+Description: Bulk guess validation and scoring for Wordy. Reads lines
+from files or stdin, each either "guess answer" (space or comma
+separated) or a single candidate word, checks every guess against the
+long word list, scores pairs with the game's rules and streams one
+result line per input line, in input order. Lines are processed in
+chunks on a process pool with a bounded number of chunks in flight, so
+input of any size is never fully loaded into memory.
+
+    python Wordle.py score archive.txt > results.csv
+    cat pairs.txt | python bulk.py --format jsonl
+"""
+
+import argparse
+import json
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from scoring import score_guess
+from wordlists import get_word_list, LONG_WORDLIST_FILENAME
+
+CHUNK_LINES = 20000
+CHUNKS_PER_WORKER = 2  # chunks queued per worker; bounds memory use
+
+# Long word list set of every word size, per process. Bulk input mixes all
+# sizes, which would thrash the small size cache of the word list itself.
+long_word_sets = {}
+
+
+def is_long_word(word):
+    word_set = long_word_sets.get(len(word))
+    if word_set is None:
+        word_set = long_word_sets[len(word)] = get_word_list(LONG_WORDLIST_FILENAME).word_set(len(word))
+    return word in word_set
+
+
+def process_line(line):
+    ''' Returns the result for one input line, or None for a blank line '''
+    fields = line.replace(",", " ").split()
+    if not fields:
+        return None
+    guess = fields[0].lower()
+    result = {"guess": guess, "valid": is_long_word(guess)}
+    if len(fields) > 1:
+        answer = fields[1].lower()
+        result["answer"] = answer
+        result["styles"] = "".join(map(str, score_guess(guess, answer))) if len(answer) == len(guess) else ""
+    return result
+
+
+def format_result(result, output_format):
+    if output_format == "jsonl":
+        return json.dumps(result, separators=(",", ":"))
+    if "answer" in result:
+        return f"{result['guess']},{result['answer']},{int(result['valid'])},{result['styles']}"
+    return f"{result['guess']},{int(result['valid'])}"
+
+
+def process_chunk(lines, output_format):
+    ''' Processes a chunk of lines and returns the formatted output for all of them '''
+    out = []
+    for line in lines:
+        result = process_line(line)
+        if result is not None:
+            out.append(format_result(result, output_format) + "\n")
+    return "".join(out)
+
+
+def read_chunks(files, chunk_lines):
+    for file in files:
+        while True:
+            lines = list(islice(file, chunk_lines))
+            if not lines:
+                break
+            yield lines
+
+
+def run(files, out, workers=None, chunk_lines=CHUNK_LINES, output_format="csv"):
+    ''' Streams the results for every line of files to out, using a pool of workers '''
+    if workers == 1:
+        for lines in read_chunks(files, chunk_lines):
+            out.write(process_chunk(lines, output_format))
+        return
+
+    workers = workers or os.cpu_count()
+    pending = deque()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for lines in read_chunks(files, chunk_lines):
+            pending.append(executor.submit(process_chunk, lines, output_format))
+            # Wait for the oldest chunk before reading further, so memory stays bounded
+            if len(pending) >= workers * CHUNKS_PER_WORKER:
+                out.write(pending.popleft().result())
+        while pending:
+            out.write(pending.popleft().result())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Validate and score Wordy guesses in bulk")
+    parser.add_argument("files", nargs="*", help="input files, stdin if none are given")
+    parser.add_argument("-o", "--output", help="output file, stdout by default")
+    parser.add_argument("--format", choices=("csv", "jsonl"), default="csv")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--chunk-lines", type=int, default=CHUNK_LINES)
+    args = parser.parse_args(argv)
+
+    files = [open(filename, "r") for filename in args.files] or [sys.stdin]
+    out = open(args.output, "w") if args.output else sys.stdout
+    try:
+        run(files, out, args.workers, args.chunk_lines, args.format)
+    finally:
+        for file in files:
+            if file is not sys.stdin:
+                file.close()
+        if out is not sys.stdout:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
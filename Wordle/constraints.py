@@ -0,0 +1,91 @@
+"""
+Description: Hard mode constraints for Wordy. The feedback of every guess
+is folded into a bitmask of allowed letters for each position plus the
+minimum and maximum number of times each letter can appear, so checking
+that a new guess is consistent with all previous feedback does not
+depend on how many guesses were made, and needs no rollback.
+"""
+
+from scoring import CORRECT_RIGHT_LOC, WRONG
+
+ANY_LETTER = -1  # mask with every bit set; bit ord(letter) is set if the letter is allowed
+
+
+class HardModeConstraints:
+    '''
+    Letters allowed at each position and bounds on letter counts, built from
+    the (guess, styles) pairs passed to add(). A word is allowed if it would
+    have produced the same feedback as the hidden word for every guess.
+    '''
+    __slots__ = ("word_size", "allowed", "min_counts", "max_counts")
+
+    def __init__(self, word_size):
+        self.word_size = word_size
+        self.reset()
+
+    def reset(self):
+        ''' Forgets every guess, so every word of the right size is allowed '''
+        self.allowed = [ANY_LETTER] * self.word_size
+        self.min_counts = {}
+        self.max_counts = {}
+
+    def add(self, guess, styles):
+        ''' Adds the feedback of a guess to the constraints '''
+        found = {}
+        has_wrong = set()
+        for i in range(self.word_size):
+            letter = guess[i]
+            bit = 1 << ord(letter)
+            if styles[i] == CORRECT_RIGHT_LOC:
+                self.allowed[i] &= bit
+                found[letter] = found.get(letter, 0) + 1
+            else:
+                self.allowed[i] &= ~bit
+                if styles[i] == WRONG:
+                    has_wrong.add(letter)
+                else:
+                    found[letter] = found.get(letter, 0) + 1
+
+        for letter, count in found.items():
+            if count > self.min_counts.get(letter, 0):
+                self.min_counts[letter] = count
+        for letter in has_wrong:
+            # A grey letter means the word has exactly as many of it as were found
+            count = found.get(letter, 0)
+            if count < self.max_counts.get(letter, self.word_size):
+                self.max_counts[letter] = count
+            if count == 0:
+                for i in range(self.word_size):
+                    self.allowed[i] &= ~(1 << ord(letter))
+
+    def allows(self, word):
+        ''' Returns True if word is consistent with every guess added so far '''
+        if len(word) != self.word_size:
+            return False
+        for i in range(self.word_size):
+            if not (self.allowed[i] >> ord(word[i])) & 1:
+                return False
+        for letter, count in self.min_counts.items():
+            if word.count(letter) < count:
+                return False
+        for letter, count in self.max_counts.items():
+            if word.count(letter) > count:
+                return False
+        return True
+
+    def filter(self, words):
+        ''' Returns the words that are consistent with every guess added so far '''
+        return [word for word in words if self.allows(word)]
+
+    def violation(self, word):
+        ''' Returns a message describing why word is not allowed, or None if it is '''
+        for i in range(self.word_size):
+            if not (self.allowed[i] >> ord(word[i])) & 1:
+                return f"{word[i].upper()} can't be letter {i + 1}"
+        for letter, count in self.min_counts.items():
+            if word.count(letter) < count:
+                return f"Guess must contain {letter.upper()}"
+        for letter, count in self.max_counts.items():
+            if word.count(letter) > count:
+                return f"Too many {letter.upper()}s"
+        return None
@@ -0,0 +1,213 @@
+"""
+Description: Daily puzzle scheduler for Wordy. Each cycle of the schedule
+is a seeded permutation of the answers of a word size, so no answer
+repeats until every answer has been a puzzle, and the puzzle of a date
+is one index into its cycle. Within a cycle the answers are split into
+difficulty tiers and every run of NUM_TIERS days takes one answer from
+each tier, easiest first. The difficulty of an answer is the average
+number of guesses a reference solver needs for it in normal and hard
+mode. It is computed for the whole list in parallel with simulate.py and
+kept in the cache as one byte per answer and mode, next to the feedback
+tables, so picking a puzzle never plays a game.
+
+The index takes seconds to build, so it is only built by running this
+module or by GameServer.preload, never when a puzzle is asked for; a
+word size without an index has no daily puzzle. The index file is keyed
+by the word lists only. It also depends on the solver and simulate.py
+code, so delete it from the cache after changing them, or the old index
+(and with it the old schedule) stays in use.
+"""
+
+import argparse
+import array
+import datetime
+import functools
+import os
+import random
+
+import feedback_table
+import simulate
+from solver import Solver
+from wordlists import get_word_list, SHORT_WORDLIST_FILENAME
+
+EPOCH = datetime.date(2022, 5, 4)  # date of puzzle number 0
+DEFAULT_SEED = 0
+NUM_TIERS = 7  # difficulty tiers, one answer of each every NUM_TIERS days
+MODES = (False, True)  # hard mode of each difficulty byte of an answer
+UNSOLVED = 0  # byte stored for answers the reference solver does not solve
+SCHEDULE_CACHE_SIZE = 4
+
+
+class ReferenceSolver(Solver):
+    '''
+    Entropy solver without decision trees, so the difficulty index only
+    depends on the word lists, not on which trees have been built.
+    '''
+
+    def __init__(self, word_size=5, table=None):
+        super().__init__(word_size, table, trees={})
+
+
+def difficulty_filename(word_size, cache_dir=feedback_table.CACHE_DIR):
+    ''' Path of the difficulty index for the shipped word lists and word size '''
+    key = feedback_table.wordlist_hash(word_size)
+    return os.path.join(cache_dir, f"difficulty_{word_size}_{key}.bin")
+
+
+def build_difficulty(word_size, workers=None):
+    '''
+    Plays every answer with the reference solver in each of MODES and returns
+    the guesses used as an array of len(answers) * len(MODES) bytes, answer by answer
+    '''
+    answers = get_word_list(SHORT_WORDLIST_FILENAME).words(word_size)
+    data = array.array("B", [UNSOLVED]) * (len(answers) * len(MODES))
+    for m, hard_mode in enumerate(MODES):
+        results = simulate.simulate(ReferenceSolver, answers, word_size, hard_mode, workers=workers)
+        for i, answer in enumerate(answers):
+            if results[answer] is not None:
+                data[i * len(MODES) + m] = results[answer]
+    return data
+
+
+def save_difficulty(word_size=5, workers=None, cache_dir=feedback_table.CACHE_DIR):
+    ''' Builds the difficulty index of word_size and writes it to the cache, replacing any old one '''
+    filename = difficulty_filename(word_size, cache_dir)
+    data = build_difficulty(word_size, workers)
+    os.makedirs(cache_dir, exist_ok=True)
+    temp_filename = f"{filename}.{os.getpid()}.tmp"
+    with open(temp_filename, "wb") as file:
+        data.tofile(file)
+    os.replace(temp_filename, filename)
+
+
+def ensure_difficulty(word_size=5, workers=None, cache_dir=feedback_table.CACHE_DIR):
+    ''' Builds the difficulty index of word_size if it has not been built yet '''
+    if not os.path.exists(difficulty_filename(word_size, cache_dir)):
+        save_difficulty(word_size, workers, cache_dir)
+
+
+def load_difficulty(word_size=5, cache_dir=feedback_table.CACHE_DIR):
+    '''
+    Returns the difficulty of every answer of word_size, in word list order.
+    Raises NoDailyPuzzleError if the index has not been built.
+    '''
+    answers = get_word_list(SHORT_WORDLIST_FILENAME).words(word_size)
+    filename = difficulty_filename(word_size, cache_dir)
+    data = array.array("B")
+    try:
+        with open(filename, "rb") as file:
+            data.frombytes(file.read())
+    except FileNotFoundError:
+        raise NoDailyPuzzleError(f"No daily puzzle for words of length {word_size}") from None
+    if len(data) != len(answers) * len(MODES):
+        raise feedback_table.CorruptTableError(f"Difficulty index {filename} does not match the word lists")
+    # A game the solver lost counts as one guess more than the game allows
+    guesses = [simulate.NUM_GUESSES + 1 if byte == UNSOLVED else byte for byte in data]
+    return [sum(guesses[i * len(MODES):(i + 1) * len(MODES)]) / len(MODES) for i in range(len(answers))]
+
+
+def cycle_order(difficulty, rng, num_tiers=NUM_TIERS):
+    '''
+    Returns one cycle of the schedule, every answer id once. Day d of the cycle
+    takes an answer of tier d % num_tiers while that tier lasts.
+    '''
+    ids = list(range(len(difficulty)))
+    rng.shuffle(ids)
+    # The sort is stable, so answers of equal difficulty stay shuffled
+    ids.sort(key=lambda i: difficulty[i])
+    tiers = [ids[t * len(ids) // num_tiers:(t + 1) * len(ids) // num_tiers] for t in range(num_tiers)]
+    for tier in tiers:
+        rng.shuffle(tier)
+    order = []
+    for day in range(max(len(tier) for tier in tiers)):
+        order.extend(tier[day] for tier in tiers if day < len(tier))
+    return order
+
+
+class DailySchedule:
+    '''
+    Puzzle of every date from epoch on. The order of each cycle is built the
+    first time a date in it is asked for, after which word() is a lookup.
+    '''
+
+    def __init__(self, answers, difficulty, seed=DEFAULT_SEED, epoch=EPOCH, num_tiers=NUM_TIERS):
+        if not answers:
+            raise ValueError("No answers to schedule")
+        self.answers = answers
+        self.difficulty = difficulty
+        self.seed = seed
+        self.epoch = epoch
+        self.num_tiers = num_tiers
+        self.orders = {}  # cycle -> answer ids by day
+
+    def number(self, date):
+        ''' Puzzle number of a date, counted in days from the epoch '''
+        number = (date - self.epoch).days
+        if number < 0:
+            raise ValueError(f"No puzzle before {self.epoch}")
+        return number
+
+    def order(self, cycle):
+        order = self.orders.get(cycle)
+        if order is None:
+            order = self.orders[cycle] = cycle_order(
+                self.difficulty, random.Random(f"{self.seed}/{cycle}"), self.num_tiers)
+        return order
+
+    def answer_id(self, date):
+        cycle, day = divmod(self.number(date), len(self.answers))
+        return self.order(cycle)[day]
+
+    def word(self, date):
+        ''' The hidden word of the puzzle of a date '''
+        return self.answers[self.answer_id(date)]
+
+    def puzzle(self, date):
+        ''' Returns (puzzle number, hidden word, difficulty) of a date '''
+        i = self.answer_id(date)
+        return self.number(date), self.answers[i], self.difficulty[i]
+
+
+@functools.lru_cache(maxsize=SCHEDULE_CACHE_SIZE)
+def get_schedule(word_size=5, seed=DEFAULT_SEED):
+    '''
+    Returns the schedule of the shipped answers of a word size. Raises
+    NoDailyPuzzleError if there are no answers or their index has not been built.
+    '''
+    answers = get_word_list(SHORT_WORDLIST_FILENAME).words(word_size)
+    if not answers:
+        raise NoDailyPuzzleError(f"No daily puzzle for words of length {word_size}")
+    return DailySchedule(answers, load_difficulty(word_size), seed)
+
+
+class NoDailyPuzzleError(Exception):
+    pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show the daily Wordy puzzles")
+    parser.add_argument("--date", type=datetime.date.fromisoformat, default=datetime.date.today(),
+                        help="first date to show, YYYY-MM-DD, today by default")
+    parser.add_argument("--days", type=int, default=NUM_TIERS, help="number of dates to show")
+    parser.add_argument("--word-size", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="processes used to build the difficulty index if it is missing")
+    parser.add_argument("--rebuild", action="store_true",
+                        help="rebuild the difficulty index, after changing the solver")
+    args = parser.parse_args()
+
+    if args.rebuild:
+        save_difficulty(args.word_size, args.workers)
+    else:
+        ensure_difficulty(args.word_size, args.workers)
+    answers = get_word_list(SHORT_WORDLIST_FILENAME).words(args.word_size)
+    schedule = DailySchedule(answers, load_difficulty(args.word_size), args.seed)
+    for day in range(args.days):
+        date = args.date + datetime.timedelta(days=day)
+        number, word, difficulty = schedule.puzzle(date)
+        print(f"{date} #{number:<6} {word:<{args.word_size}} {difficulty:.1f}")
+
+
+if __name__ == "__main__":
+    main()
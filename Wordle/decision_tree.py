@@ -0,0 +1,347 @@
+"""
+Description: Decision trees for Wordy. A tree gives the next guess for
+every feedback history that can be reached by following it, so once a
+tree is saved a hint is one dictionary lookup per guess.
+
+Trees are found by a depth first branch and bound search. Every node
+tries the best few guesses by information, abandons a guess as soon as
+a lower bound on its cost shows it cannot beat the best guess found so
+far, and memoizes its result on the candidate set. The objective is the
+total number of guesses over all answers ("average") or the largest
+number of guesses any answer needs ("worst"). In hard mode a guess must
+be consistent with all previous feedback, like
+constraints.HardModeConstraints checks in the game.
+
+Run this file to build a tree and save it next to the feedback table,
+where solver.Solver picks it up.
+"""
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import feedback_table
+import solver
+from scoring import score_guess, encode_pattern, solved_code
+
+try:
+    import vectorized
+except ImportError:  # numpy is not installed, filter hard mode guesses in pure Python
+    vectorized = None
+
+NUM_GUESSES = 6
+SEARCH_WIDTH = 8  # guesses tried at every node, best ranked first
+ROOT_WIDTH = 4  # first guesses tried, each searched in parallel
+OBJECTIVES = ("average", "worst")
+ROOT = 0  # index of the root node of every tree
+
+# Trees loaded by saved_trees, keyed by file name
+_trees = {}
+
+# TreeSearch of the current worker process, created by init_worker
+_search = None
+
+
+class DecisionTree:
+    '''
+    Saved decision tree. Node i is (guess, {pattern: child node}); the
+    pattern of a solved guess has no child.
+    '''
+
+    def __init__(self, nodes, hard_mode, objective, total, depth):
+        self.nodes = nodes
+        self.hard_mode = hard_mode
+        self.objective = objective
+        self.total = total  # guesses needed over all answers
+        self.depth = depth  # guesses needed by the hardest answer
+
+    def guess(self, node):
+        return self.nodes[node][0]
+
+    def child(self, node, code):
+        ''' Returns the node reached after the pattern code, or None if the tree has no such node '''
+        return self.nodes[node][1].get(code)
+
+    def to_dict(self):
+        return {
+            "hard_mode": self.hard_mode,
+            "objective": self.objective,
+            "total": self.total,
+            "depth": self.depth,
+            "nodes": [[guess, {str(code): child for code, child in children.items()}]
+                      for guess, children in self.nodes],
+        }
+
+
+def tree_from_dict(data):
+    nodes = [(guess, {int(code): child for code, child in children.items()})
+             for guess, children in data["nodes"]]
+    return DecisionTree(nodes, data["hard_mode"], data["objective"], data["total"], data["depth"])
+
+
+def flatten(root, hard_mode, objective, total, depth):
+    ''' Turns a nested (guess, {pattern: child}) search result into a DecisionTree '''
+    nodes = []
+    stack = [(root, None, None)]
+    while stack:
+        (guess, children), parent, code = stack.pop()
+        if parent is not None:
+            nodes[parent][1][code] = len(nodes)
+        nodes.append((guess, {}))
+        index = len(nodes) - 1
+        stack.extend((child, index, child_code) for child_code, child in children.items())
+    return DecisionTree(nodes, hard_mode, objective, total, depth)
+
+
+def lower_bound(num_candidates):
+    '''
+    (total, depth) no guess can beat for a node: one candidate takes one
+    guess, and of two or more at most one is solved by the first guess
+    '''
+    if num_candidates == 1:
+        return 1, 1
+    return 2 * num_candidates - 1, 2
+
+
+class TreeSearch:
+    ''' Branch and bound search for the decision tree of one word size and mode '''
+
+    def __init__(self, word_size=5, hard_mode=False, objective="average", width=SEARCH_WIDTH,
+                 num_guesses=NUM_GUESSES, table=None):
+        self.solver = solver.Solver(word_size, table, trees={})
+        self.table = self.solver.table
+        self.word_size = word_size
+        self.hard_mode = hard_mode
+        self.objective = objective
+        self.width = width
+        self.num_guesses = num_guesses
+        self.solved = solved_code(word_size)
+        # Guess index of every answer, so a candidate can be guessed
+        self.answer_guesses = [self.table.guess_index[word] for word in self.table.answers]
+        self.encoded = None
+        if hard_mode and vectorized is not None and self.table.guesses:
+            self.encoded = vectorized.encode_words(self.table.guesses, word_size)
+        self.memo = {}
+
+    def key(self, total, depth):
+        ''' Sort key of a cost, smaller is better '''
+        return (total, depth) if self.objective == "average" else (depth, total)
+
+    def partition(self, guess, candidates):
+        ''' Groups the candidates by the pattern guess would give against them '''
+        if self.solver.matrix is not None:
+            codes = self.solver.matrix[guess, candidates].tolist()
+        else:
+            row = self.table.row(self.table.guesses[guess])
+            codes = [row[a] for a in candidates]
+        parts = {}
+        for a, code in zip(candidates, codes):
+            parts.setdefault(code, []).append(a)
+        return parts
+
+    def partition_allowed(self, guess, allowed):
+        ''' Groups the allowed hard mode guesses by the pattern guess would give if they were the answer '''
+        if self.encoded is not None:
+            codes = vectorized.score_against_all(self.encoded[guess], self.encoded[allowed]).tolist()
+        else:
+            word = self.table.guesses[guess]
+            codes = [encode_pattern(score_guess(word, self.table.guesses[g])) for g in allowed]
+        parts = {}
+        for g, code in zip(allowed, codes):
+            parts.setdefault(code, []).append(g)
+        return parts
+
+    def choices(self, candidates, allowed, width=None):
+        ''' The guesses worth trying at a node, best entropy first, preferring candidates on ties '''
+        pool = allowed if self.hard_mode else range(len(self.table.guesses))
+        pool = list(pool)
+        entropies = self.solver.entropies(pool, candidates)
+        candidate_guesses = set(self.answer_guesses[a] for a in candidates)
+        order = sorted(range(len(pool)), key=lambda i: (-entropies[i], pool[i] not in candidate_guesses))
+        guesses = [pool[i] for i in order[:width or self.width]]
+        # The best candidate can win outright, so it is always worth trying
+        best_candidate = next((pool[i] for i in order if pool[i] in candidate_guesses), None)
+        if best_candidate is not None and best_candidate not in guesses:
+            guesses.append(best_candidate)
+        return guesses
+
+    def search(self, candidates, allowed, guesses_left):
+        '''
+        Returns (total, depth, node) of the best tree found for the candidate
+        answers, where node is (guess, {pattern: child node}), or None if
+        they cannot all be solved in guesses_left guesses
+        '''
+        key = (tuple(candidates), tuple(allowed) if self.hard_mode else None, guesses_left)
+        if key in self.memo:
+            return self.memo[key]
+
+        result = None
+        num_candidates = len(candidates)
+        if lower_bound(num_candidates)[1] > guesses_left:
+            pass
+        elif num_candidates <= 2:
+            # Guessing a candidate reaches the lower bound
+            first = self.table.answers[candidates[0]]
+            children = {}
+            if num_candidates == 2:
+                second = self.table.answers[candidates[1]]
+                children[self.table.pattern(first, second)] = (second, {})
+            result = lower_bound(num_candidates) + ((first, children),)
+        else:
+            result = self.search_guesses(candidates, allowed, guesses_left,
+                                         self.choices(candidates, allowed))
+        self.memo[key] = result
+        return result
+
+    def search_guesses(self, candidates, allowed, guesses_left, guesses):
+        ''' Returns the best search result over the given guesses at one node, or None '''
+        best = None
+        for guess in guesses:
+            parts = self.partition(guess, candidates)
+            if len(parts) == 1 and self.solved not in parts:
+                continue  # learns nothing
+            allowed_parts = self.partition_allowed(guess, allowed) if self.hard_mode else {}
+            bounds = {code: lower_bound(len(part)) for code, part in parts.items() if code != self.solved}
+            total = len(candidates) + sum(bound[0] for bound in bounds.values())
+            depth = 1 + max((bound[1] for bound in bounds.values()), default=0)
+            if best is not None and self.key(total, depth) >= best[0]:
+                continue
+
+            children = {}
+            # Largest partitions first, they decide most of the cost
+            for code in sorted(bounds, key=lambda code: -len(parts[code])):
+                child = self.search(parts[code], allowed_parts.get(code), guesses_left - 1)
+                if child is None:
+                    break
+                total += child[0] - bounds[code][0]
+                depth = max(depth, 1 + child[1])
+                children[code] = child[2]
+                if best is not None and self.key(total, depth) >= best[0]:
+                    break
+            else:
+                best = (self.key(total, depth), total, depth, (self.table.guesses[guess], children))
+        return best[1:] if best is not None else None
+
+
+def init_worker(word_size, hard_mode, objective, width, num_guesses):
+    global _search
+    _search = TreeSearch(word_size, hard_mode, objective, width, num_guesses)
+
+
+def search_part(candidates, allowed, guesses_left):
+    return _search.search(candidates, allowed, guesses_left)
+
+
+def build_tree(word_size=5, hard_mode=False, objective="average", width=SEARCH_WIDTH,
+               root_width=ROOT_WIDTH, num_guesses=NUM_GUESSES, workers=None):
+    '''
+    Searches the decision tree for every answer of the word size and returns
+    it as a DecisionTree, or None if the answers cannot all be solved within
+    num_guesses. The partitions of the best root_width first guesses are
+    searched on a process pool.
+    '''
+    search = TreeSearch(word_size, hard_mode, objective, width, num_guesses)
+    candidates = list(range(len(search.table.answers)))
+    allowed = list(range(len(search.table.guesses))) if hard_mode else None
+    if not candidates:
+        return None
+    if len(candidates) <= 2 or num_guesses < 2:
+        result = search.search(candidates, allowed, num_guesses)
+        return flatten(result[2], hard_mode, objective, result[0], result[1]) if result else None
+
+    roots = search.choices(candidates, allowed, root_width)
+    best = None
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                             initargs=(word_size, hard_mode, objective, width, num_guesses)) as executor:
+        jobs = []
+        for guess in roots:
+            parts = search.partition(guess, candidates)
+            allowed_parts = search.partition_allowed(guess, allowed) if hard_mode else {}
+            futures = {code: executor.submit(search_part, part, allowed_parts.get(code), num_guesses - 1)
+                       for code, part in parts.items() if code != search.solved}
+            jobs.append((guess, futures))
+
+        for guess, futures in jobs:
+            total = len(candidates)
+            depth = 1
+            children = {}
+            for code, future in futures.items():
+                child = future.result()
+                if child is None:
+                    break
+                total += child[0]
+                depth = max(depth, 1 + child[1])
+                children[code] = child[2]
+            else:
+                if best is None or search.key(total, depth) < best[0]:
+                    best = (search.key(total, depth), total, depth, (search.table.guesses[guess], children))
+
+    if best is None:
+        return None
+    return flatten(best[3], hard_mode, objective, best[1], best[2])
+
+
+def tree_filename(table, hard_mode, objective):
+    ''' Path of the saved tree for a feedback table, or None if the table has no cache file '''
+    if table.filename is None:
+        return None
+    mode = "hard" if hard_mode else "normal"
+    return f"{os.path.splitext(table.filename)[0]}_tree_{mode}_{objective}.json"
+
+
+def save_tree(tree, filename):
+    temp_filename = f"{filename}.{os.getpid()}.tmp"
+    with open(temp_filename, "w") as file:
+        json.dump(tree.to_dict(), file, separators=(",", ":"))
+    os.replace(temp_filename, filename)
+
+
+def saved_trees(table, objective="average"):
+    ''' Returns {hard mode: DecisionTree} of the trees saved for a feedback table '''
+    trees = {}
+    for hard_mode in (False, True):
+        filename = tree_filename(table, hard_mode, objective)
+        if filename is None:
+            continue
+        tree = _trees.get(filename)
+        if tree is None:
+            try:
+                with open(filename, "r") as file:
+                    tree = tree_from_dict(json.load(file))
+            except FileNotFoundError:
+                continue
+            _trees[filename] = tree
+        trees[hard_mode] = tree
+    return trees
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build and save a Wordy decision tree")
+    parser.add_argument("--word-size", type=int, default=5)
+    parser.add_argument("--hard", action="store_true", help="build the hard mode tree")
+    parser.add_argument("--objective", choices=OBJECTIVES, default="average")
+    parser.add_argument("--width", type=int, default=SEARCH_WIDTH, help="guesses tried at every node")
+    parser.add_argument("--root-width", type=int, default=ROOT_WIDTH, help="first guesses tried")
+    parser.add_argument("--guesses", type=int, default=NUM_GUESSES)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    tree = build_tree(args.word_size, args.hard, args.objective, args.width, args.root_width,
+                      args.guesses, args.workers)
+    elapsed = time.perf_counter() - start
+    if tree is None:
+        raise SystemExit(f"No tree solves every answer within {args.guesses} guesses")
+
+    table = feedback_table.get_table(args.word_size)
+    filename = tree_filename(table, args.hard, args.objective)
+    save_tree(tree, filename)
+    print(f"Built in {elapsed:.1f}s: first guess {tree.guess(ROOT)}, {len(tree.nodes)} nodes, "
+          f"mean {tree.total / len(table.answers):.4f} guesses, at most {tree.depth}")
+    print(f"Saved to {filename}")
+
+
+if __name__ == "__main__":
+    main()
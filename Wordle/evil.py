@@ -0,0 +1,74 @@
+"""
+Description: Adversarial ("evil") mode for Wordy. The hidden word is not
+fixed when the game starts. After every guess the answers that are still
+possible are grouped by the feedback the guess would give against each
+of them, and the game keeps the largest group, telling the player as
+little as it can. The groups come from the precomputed feedback table,
+so a guess costs one table row lookup instead of rescoring every answer.
+"""
+
+from collections import Counter
+
+from scoring import score_guess, encode_pattern, decode_pattern, solved_code
+from solver import Solver
+
+try:
+    import vectorized
+except ImportError:  # numpy is not installed, score guesses outside the table in pure Python
+    vectorized = None
+
+
+class Adversary:
+    '''
+    Answers still possible in one evil game. respond() picks the feedback
+    of each guess; hidden_word() is an answer consistent with all of it.
+    '''
+
+    def __init__(self, word_size=5, table=None):
+        self.word_size = word_size
+        # The solver already tracks the answers consistent with the feedback
+        self.solver = Solver(word_size, table, trees={})
+        self.encoded_answers = None
+
+    def reset(self):
+        self.solver.reset()
+
+    def candidate_words(self):
+        return self.solver.candidate_words()
+
+    def hidden_word(self):
+        ''' The answer the game would reveal now, or None if there is none '''
+        candidates = self.solver.candidates
+        return self.solver.table.answers[candidates[0]] if candidates else None
+
+    def patterns(self, guess):
+        ''' Encoded pattern of guess against every remaining answer '''
+        if guess in self.solver.table.guess_index:
+            return self.solver.patterns(guess)
+        answers = self.solver.table.answers
+        candidates = self.solver.candidates
+        if vectorized is not None and len(guess) == self.word_size and guess.isascii() and guess.isalpha():
+            if self.encoded_answers is None:
+                self.encoded_answers = vectorized.encode_words(answers, self.word_size)
+            encoded_guess = vectorized.encode_words([guess], self.word_size)[0]
+            return vectorized.score_against_all(encoded_guess, self.encoded_answers[candidates]).tolist()
+        return [encode_pattern(score_guess(guess, answers[i])) for i in candidates]
+
+    def respond(self, guess):
+        '''
+        Returns the styles of guess for the largest group of remaining answers
+        and keeps only that group. Ties go to feedback that does not solve the
+        game, then to the feedback with the fewest hits.
+        '''
+        counts = Counter(self.patterns(guess))
+        if not counts:
+            raise NoAnswersError("No answers are left")
+        solved = solved_code(self.word_size)
+        code = max(counts, key=lambda code: (counts[code], code != solved, -code))
+        styles = decode_pattern(code, self.word_size)
+        self.solver.update(guess, styles)
+        return styles
+
+
+class NoAnswersError(Exception):
+    pass
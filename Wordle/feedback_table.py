@@ -0,0 +1,147 @@
+"""
+Description: Precomputed feedback table for Wordy. Holds the encoded
+pattern (see scoring.encode_pattern) of every guess in the long word list
+against every answer in the short word list. The table is written once
+to a cache file and memory-mapped read-only by later processes, so they
+all share one copy through the OS page cache instead of rescoring.
+"""
+
+import array
+import functools
+import hashlib
+import mmap
+import os
+
+from scoring import score_guess, encode_pattern
+from wordlists import get_word_list, LONG_WORDLIST_FILENAME, SHORT_WORDLIST_FILENAME
+
+try:
+    import vectorized
+except ImportError:  # numpy is not installed, fall back to the pure Python engine
+    vectorized = None
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache")
+TABLE_CACHE_SIZE = 2  # number of word sizes whose table stays mapped by get_table
+
+
+class FeedbackTable:
+    '''
+    Guess x answer table of encoded patterns. Row g holds the patterns of
+    guesses[g] against every word in answers.
+    '''
+
+    def __init__(self, guesses, answers, data, mapped=None, filename=None):
+        self.guesses = guesses
+        self.answers = answers
+        self.data = data
+        self.num_answers = len(answers)
+        self.guess_index = {word: i for i, word in enumerate(guesses)}
+        self.answer_index = {word: i for i, word in enumerate(answers)}
+        self._mapped = mapped
+        self.filename = filename  # cache file backing the table, if any
+
+    def pattern(self, guess, answer):
+        ''' Returns the encoded pattern of guess against answer '''
+        return self.data[self.guess_index[guess] * self.num_answers + self.answer_index[answer]]
+
+    def row(self, guess):
+        ''' Returns the encoded patterns of guess against every answer '''
+        start = self.guess_index[guess] * self.num_answers
+        return self.data[start:start + self.num_answers]
+
+    def close(self):
+        ''' Releases the memory map, if the table is backed by one '''
+        if self._mapped is not None:
+            self.data.release()
+            self._mapped.close()
+            self._mapped = None
+
+
+def table_typecode(word_size):
+    ''' Smallest array typecode that can hold every pattern for the word size '''
+    if 3 ** word_size <= 2 ** 8:
+        return "B"
+    elif 3 ** word_size <= 2 ** 16:
+        return "H"
+    elif 3 ** word_size <= 2 ** 32:
+        return "I"
+    return "Q"
+
+
+def wordlist_hash(word_size, long_filename=LONG_WORDLIST_FILENAME, short_filename=SHORT_WORDLIST_FILENAME):
+    ''' Hash of both word list files and the word size, used to invalidate cached tables '''
+    digest = hashlib.sha256()
+    for filename in (long_filename, short_filename):
+        with open(filename, "rb") as file:
+            digest.update(file.read())
+    digest.update(str(word_size).encode())
+    return digest.hexdigest()[:16]
+
+
+def build_table(guesses, answers, word_size):
+    ''' Scores every guess against every answer and returns the patterns as an array '''
+    data = array.array(table_typecode(word_size))
+    if vectorized is not None and guesses and answers:
+        table = vectorized.score_table(vectorized.encode_words(guesses, word_size),
+                                       vectorized.encode_words(answers, word_size))
+        data.frombytes(table.tobytes())
+        return data
+    for guess in guesses:
+        data.extend(encode_pattern(score_guess(guess, answer)) for answer in answers)
+    return data
+
+
+def table_filename(word_size, cache_dir=CACHE_DIR, long_filename=LONG_WORDLIST_FILENAME, short_filename=SHORT_WORDLIST_FILENAME):
+    ''' Path of the cache file for the given word lists and word size '''
+    key = wordlist_hash(word_size, long_filename, short_filename)
+    return os.path.join(cache_dir, f"feedback_{word_size}_{key}.bin")
+
+
+def load_table(word_size=5, cache_dir=CACHE_DIR, long_filename=LONG_WORDLIST_FILENAME, short_filename=SHORT_WORDLIST_FILENAME):
+    '''
+    Returns the FeedbackTable for the word lists, memory-mapping the cache
+    file and building it first if it does not exist yet
+    '''
+    guesses = get_word_list(long_filename).words(word_size)
+    answers = get_word_list(short_filename).words(word_size)
+    filename = table_filename(word_size, cache_dir, long_filename, short_filename)
+
+    if not os.path.exists(filename):
+        data = build_table(guesses, answers, word_size)
+        os.makedirs(cache_dir, exist_ok=True)
+        # Write to a temporary file first so other processes never map a half written table
+        temp_filename = f"{filename}.{os.getpid()}.tmp"
+        with open(temp_filename, "wb") as file:
+            data.tofile(file)
+        os.replace(temp_filename, filename)
+
+    if len(guesses) == 0 or len(answers) == 0:
+        return FeedbackTable(guesses, answers, array.array(table_typecode(word_size)), filename=filename)
+
+    with open(filename, "rb") as file:
+        mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    data = memoryview(mapped).cast(table_typecode(word_size))
+    if len(data) != len(guesses) * len(answers):
+        data.release()
+        mapped.close()
+        raise CorruptTableError(f"Feedback table {filename} does not match the word lists")
+    return FeedbackTable(guesses, answers, data, mapped, filename)
+
+
+def table_built(word_size, cache_dir=CACHE_DIR):
+    ''' Whether the table of the shipped word lists for a word size is in the cache, so loading it builds nothing '''
+    return os.path.exists(table_filename(word_size, cache_dir))
+
+
+@functools.lru_cache(maxsize=TABLE_CACHE_SIZE)
+def get_table(word_size):
+    '''
+    Returns the shared table of the shipped word lists for a word size. Only
+    the most recently used sizes stay cached. An evicted table is unmapped
+    once nothing else references it and it is garbage collected.
+    '''
+    return load_table(word_size)
+
+
+class CorruptTableError(Exception):
+    pass
@@ -0,0 +1,305 @@
+"""
+Description: Headless game rules for Wordy. GameState holds one game,
+deciding which hidden words and guesses are accepted and scoring them,
+without any tkinter state; Wordy is a window on top of it. SharedWords
+holds the immutable word lists and feedback table that every game of one
+word size can share, and Boards the hidden words of a multi-board
+(Quordle style) game.
+"""
+
+import functools
+import random
+
+import feedback_table
+from constraints import HardModeConstraints
+from evil import Adversary
+from scoring import score_guess, score_against, decode_pattern, is_solved, WRONG
+from wordlists import get_word_list, LONG_WORDLIST_FILENAME, SHORT_WORDLIST_FILENAME, WORD_SIZE_CACHE_SIZE
+
+try:
+    import vectorized
+except ImportError:  # numpy is not installed, score the boards one at a time
+    vectorized = None
+
+NUM_GUESSES = 6
+
+
+class SharedWords:
+    '''
+    Word lists, and optionally the feedback table, for one word size. Games
+    only read it, so any number of games can share it.
+    '''
+    __slots__ = ("word_size", "guesses", "guess_set", "answers", "answer_set", "table")
+
+    def __init__(self, word_size, table=None):
+        self.word_size = word_size
+        long_words = get_word_list(LONG_WORDLIST_FILENAME)
+        short_words = get_word_list(SHORT_WORDLIST_FILENAME)
+        self.guesses = long_words.words(word_size)
+        self.guess_set = long_words.word_set(word_size)
+        self.answers = short_words.words(word_size)
+        self.answer_set = short_words.word_set(word_size)
+        self.table = table
+
+    def load_table(self):
+        ''' Scores from the precomputed feedback table from now on '''
+        self.table = feedback_table.get_table(self.word_size)
+        return self
+
+    def score(self, guess, answer):
+        ''' Returns the styles of guess against answer, from the table when both words are in it '''
+        if self.table is not None:
+            g = self.table.guess_index.get(guess)
+            a = self.table.answer_index.get(answer)
+            if g is not None and a is not None:
+                return decode_pattern(self.table.data[g * self.table.num_answers + a], self.word_size)
+        return score_guess(guess, answer)
+
+
+@functools.lru_cache(maxsize=WORD_SIZE_CACHE_SIZE)
+def shared_words(word_size):
+    ''' Returns the SharedWords of a word size, keeping only the most recently used sizes '''
+    return SharedWords(word_size)
+
+
+class KeyboardState:
+    '''
+    Best style found so far for every letter of one game, green beating
+    orange beating grey. Styles are numbered in that order, so the best
+    style is the smallest.
+    '''
+    __slots__ = ("styles",)
+
+    def __init__(self):
+        self.styles = {}
+
+    def reset(self):
+        self.styles = {}
+
+    def style(self, letter):
+        return self.styles.get(letter)
+
+    def merge(self, guess, styles):
+        ''' Adds the feedback of a guess and returns {letter: style} of only the keys that changed '''
+        changed = {}
+        for letter, style in zip(guess, styles):
+            if style < self.styles.get(letter, WRONG + 1):
+                self.styles[letter] = style
+                changed[letter] = style
+        return changed
+
+
+class Boards:
+    '''
+    Hidden words of a multi-board game. A guess is scored against every
+    board still being played in one batched call, and a board stops being
+    played once its word has been guessed.
+    '''
+    __slots__ = ("word_size", "hidden_words", "solved", "encoded")
+
+    def __init__(self, hidden_words, word_size):
+        self.word_size = word_size
+        self.hidden_words = list(hidden_words)
+        self.solved = [False] * len(self.hidden_words)
+        self.encoded = None  # letter codes of the hidden words, for batched scoring
+        if vectorized is not None and all(len(word) == word_size and word.isascii() and word.isalpha()
+                                          for word in self.hidden_words):
+            self.encoded = vectorized.encode_words(self.hidden_words, word_size)
+
+    def __len__(self):
+        return len(self.hidden_words)
+
+    def active(self):
+        ''' Returns the boards whose word has not been guessed yet '''
+        return [board for board, solved in enumerate(self.solved) if not solved]
+
+    def unsolved_words(self):
+        return [self.hidden_words[board] for board in self.active()]
+
+    @property
+    def won(self):
+        return all(self.solved)
+
+    def score(self, guess):
+        ''' Returns {board: styles} of guess against every active board, and marks the boards it solves '''
+        active = self.active()
+        if self.encoded is not None and len(guess) == self.word_size and guess.isascii() and guess.isalpha():
+            encoded_guess = vectorized.encode_words([guess], self.word_size)[0]
+            codes = vectorized.score_against_all(encoded_guess, self.encoded[active]).tolist()
+            styles = [decode_pattern(code, self.word_size) for code in codes]
+        else:
+            styles = score_against(guess, [self.hidden_words[board] for board in active])
+        results = dict(zip(active, styles))
+        for board, board_styles in results.items():
+            if is_solved(board_styles):
+                self.solved[board] = True
+        return results
+
+
+class GameState:
+    '''
+    State of one game. start(), guess() and check() raise GameError with the
+    message Wordy would display when the hidden word or a guess is not
+    accepted; guess() is check() followed by play(). In evil mode the hidden
+    word is re-picked by an evil.Adversary after every guess, and the one
+    given to start() only stands until the first guess. With more than one
+    board the hidden words are held by a Boards.
+    '''
+    __slots__ = ("words", "num_guesses", "hard_mode", "guesses_must_be_words", "evil", "num_boards",
+                 "adversary", "boards", "hidden_word", "guesses", "constraints", "keyboard", "changed_keys",
+                 "over", "won")
+
+    def __init__(self, words, num_guesses=NUM_GUESSES, hard_mode=False, guesses_must_be_words=True,
+                 evil=False, num_boards=1):
+        self.words = words
+        self.num_guesses = num_guesses
+        self.hard_mode = hard_mode
+        self.guesses_must_be_words = guesses_must_be_words
+        self.evil = evil
+        self.num_boards = num_boards
+        self.adversary = None  # created by the first evil start()
+        self.boards = None  # created by start() when there is more than one board
+        self.hidden_word = None
+        self.guesses = []  # (word, styles) of every accepted guess, (word, {board: styles}) with boards
+        self.constraints = None
+        self.keyboard = KeyboardState()
+        self.changed_keys = {}  # {letter: style} of the keys the last guess changed
+        self.over = False
+        self.won = False
+
+    @property
+    def word_size(self):
+        return self.words.word_size
+
+    def start(self, word=None, rng=random):
+        ''' Starts the game with word as the hidden word, or random answers if word is None '''
+        self.boards = None
+        if self.num_boards > 1:
+            if self.hard_mode or self.evil or word is not None:
+                raise GameError("Hard mode, evil mode and specified words play one board")
+            if len(self.words.answers) < self.num_boards:
+                raise GameError(f"Not enough words of length {self.word_size}")
+            self.boards = Boards(rng.sample(self.words.answers, self.num_boards), self.word_size)
+            hidden_word = None
+        elif word is None:
+            if not self.words.answers:
+                raise GameError(f"No words of length {self.word_size}")
+            hidden_word = rng.choice(self.words.answers)
+        else:
+            hidden_word = word.lower()
+            if len(hidden_word) != self.word_size:
+                raise GameError("Incorrect specified word length")
+            if self.guesses_must_be_words and hidden_word not in self.words.answer_set:
+                raise GameError("Specified word not a valid word")
+        self.hidden_word = hidden_word
+        self.guesses = []
+        self.constraints = HardModeConstraints(self.word_size) if self.hard_mode else None
+        self.keyboard.reset()
+        self.changed_keys = {}
+        if self.evil:
+            if not self.words.answers:
+                raise GameError(f"No words of length {self.word_size}")
+            if self.adversary is None:
+                # Building a table takes seconds, far too long for a game start
+                if self.words.table is None and not feedback_table.table_built(self.word_size):
+                    raise GameError(f"Evil mode needs the precomputed table of length {self.word_size}")
+                self.adversary = Adversary(self.word_size, self.words.table)
+            self.adversary.reset()
+        self.over = False
+        self.won = False
+
+    def hidden_words(self):
+        ''' The hidden word of every board '''
+        return self.boards.hidden_words if self.boards is not None else [self.hidden_word]
+
+    def active_boards(self):
+        ''' The boards whose word has not been guessed yet '''
+        if self.boards is not None:
+            return self.boards.active()
+        return [] if self.won else [0]
+
+    def guess(self, word):
+        '''
+        Scores an entered guess and returns its styles, or {board: styles} of
+        the boards still being played when there is more than one board
+        '''
+        return self.play(self.check(word))
+
+    def check(self, word):
+        ''' Returns the guess in lower case, raising GameError unless the game would accept it '''
+        if (self.hidden_word is None and self.boards is None) or self.over:
+            raise GameError("Game is not running")
+        word = word.lower()
+        if len(word) != self.word_size:
+            raise GameError("Word not finished")
+        if self.guesses_must_be_words and word not in self.words.guess_set:
+            raise GameError("Word is not in word list")
+        if self.constraints is not None and not self.constraints.allows(word):
+            raise GameError(
+                f"{word} is not consistent with previous guesses. {self.constraints.violation(word)}.")
+        return word
+
+    def play(self, word):
+        ''' Scores a guess that check() returned, like guess() but without checking it again '''
+        if self.boards is not None:
+            result = self.boards.score(word)
+            board_styles = list(result.values())
+            solved = self.boards.won
+        else:
+            if self.adversary is not None:
+                result = self.adversary.respond(word)
+                self.hidden_word = self.adversary.hidden_word()
+            else:
+                result = self.words.score(word, self.hidden_word)
+            board_styles = [result]
+            solved = is_solved(result)
+        self.guesses.append((word, result))
+        if self.constraints is not None:
+            self.constraints.add(word, result)
+        self.changed_keys = {}
+        for styles in board_styles:
+            self.changed_keys.update(self.keyboard.merge(word, styles))
+        if solved:
+            self.over = True
+            self.won = True
+        elif len(self.guesses) == self.num_guesses:
+            self.over = True
+        return result
+
+    def message(self):
+        ''' Message Wordy shows when the game is over, or None while it is running '''
+        if self.won:
+            return "Correct. Nice Job. Game Over"
+        elif self.over:
+            if self.boards is not None:
+                return f"Guesses used up. Words were {', '.join(self.boards.unsolved_words())}. Game over."
+            return f"Guesses used up. Word was {self.hidden_word}. Game over."
+        return None
+
+    def to_dict(self):
+        ''' Public state of the game; the hidden words are only included once the game is over '''
+        if self.boards is not None:
+            guesses = [[word, [list(result[board]) if board in result else None
+                               for board in range(self.num_boards)]] for word, result in self.guesses]
+        else:
+            guesses = [[word, list(styles)] for word, styles in self.guesses]
+        state = {
+            "word_size": self.word_size,
+            "num_guesses": self.num_guesses,
+            "hard_mode": self.hard_mode,
+            "evil": self.evil,
+            "guesses": guesses,
+            "keyboard": dict(self.keyboard.styles),
+            "over": self.over,
+            "won": self.won,
+            "hidden_word": self.hidden_word if self.over else None,
+        }
+        if self.boards is not None:
+            state["num_boards"] = self.num_boards
+            state["solved"] = list(self.boards.solved)
+            state["hidden_words"] = self.boards.hidden_words if self.over else None
+        return state
+
+
+class GameError(Exception):
+    pass
@@ -0,0 +1,100 @@
+"""
+Description: Opt-in timing for Wordy's game loop. Timings keeps a count,
+total, maximum and a histogram with power of two buckets for every timed
+name, and instrument() swaps methods of one object for timed wrappers,
+so nothing is timed and nothing costs anything unless timing is switched
+on for that object.
+"""
+
+import functools
+import time
+
+NUM_BUCKETS = 32  # bucket i holds durations under 2 ** i microseconds, down to the bucket before
+PERCENTILES = (50, 90, 99)
+
+
+class Histogram:
+    ''' Durations of one timed name, in microseconds '''
+    __slots__ = ("count", "total", "max", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * NUM_BUCKETS
+
+    def add(self, microseconds):
+        self.count += 1
+        self.total += microseconds
+        if microseconds > self.max:
+            self.max = microseconds
+        self.buckets[min(int(microseconds).bit_length(), NUM_BUCKETS - 1)] += 1
+
+    def percentile(self, percent):
+        ''' Upper bound in microseconds of the bucket holding the given percentile '''
+        rank = percent / 100 * self.count
+        seen = 0
+        for i, count in enumerate(self.buckets):
+            seen += count
+            if count and seen >= rank:
+                return min(2 ** i, self.max)
+        return self.max
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "total_us": self.total,
+            "mean_us": self.total / self.count if self.count else 0.0,
+            "max_us": self.max,
+            **{f"p{p}_us": self.percentile(p) for p in PERCENTILES},
+            # Bucket upper bound in microseconds -> number of durations
+            "histogram": {2 ** i: count for i, count in enumerate(self.buckets) if count},
+        }
+
+
+class Timings:
+    ''' Histograms of named durations '''
+
+    def __init__(self):
+        self.histograms = {}
+
+    def add(self, name, seconds):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = Histogram()
+        histogram.add(seconds * 1e6)
+
+    def timed(self, name, func):
+        ''' Returns func wrapped so that every call is added under name '''
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.add(name, time.perf_counter() - start)
+        return wrapper
+
+    def reset(self):
+        self.histograms = {}
+
+    def report(self):
+        ''' Returns {name: statistics} for every timed name '''
+        return {name: histogram.to_dict() for name, histogram in sorted(self.histograms.items())}
+
+    def format(self):
+        ''' Returns the report as a table, the names with the most total time first '''
+        lines = [f"{'name':<22} {'count':>8} {'total ms':>10} {'mean us':>10} "
+                 + " ".join(f"{f'p{p} us':>9}" for p in PERCENTILES) + f" {'max us':>10}"]
+        for name, histogram in sorted(self.histograms.items(), key=lambda item: -item[1].total):
+            lines.append(f"{name:<22} {histogram.count:>8} {histogram.total / 1000:>10.2f} "
+                         f"{histogram.total / histogram.count:>10.1f} "
+                         + " ".join(f"{histogram.percentile(p):>9.0f}" for p in PERCENTILES)
+                         + f" {histogram.max:>10.1f}")
+        return "\n".join(lines)
+
+
+def instrument(obj, timings, names):
+    ''' Replaces each named method of obj, on obj only, with a wrapper timing it under its name '''
+    for name in names:
+        setattr(obj, name, timings.timed(name, getattr(obj, name)))
@@ -0,0 +1,226 @@
+"""
+Description: Letter index for Wordy word lists. Every word is stored as
+26 bit letter masks, one of the letters it has at least once, one of
+those it has at least twice and so on, plus its letter codes by
+position, all in packed arrays. The words consistent with a set of
+constraints.HardModeConstraints are then found with bitwise operations
+over the whole list at once, instead of string work for every word.
+PositionIndex holds, for every position and letter, the set of words
+with that letter there as an int bitset, so the words starting with a
+prefix are found with one AND per typed letter.
+"""
+
+import array
+
+from constraints import ANY_LETTER
+
+try:
+    import numpy as np
+except ImportError:  # numpy is not installed, filter the packed arrays in pure Python
+    np = None
+
+ALPHABET_SIZE = 26
+ALL_LETTERS = (1 << ALPHABET_SIZE) - 1
+FIRST_LETTER = ord("a")
+OTHER_CHARACTER = ALPHABET_SIZE  # letter code of any character outside a-z
+NUM_COUNT_LEVELS = 3  # masks of letters present at least once, twice and three times
+
+# Maps the bytes of a word to letter codes
+LETTER_CODES = bytes(byte - FIRST_LETTER if FIRST_LETTER <= byte < FIRST_LETTER + ALPHABET_SIZE
+                     else OTHER_CHARACTER for byte in range(256))
+
+
+class LetterIndex:
+    '''
+    Packed letter masks and letter codes of a list of words of one size.
+    masks[k][i] has bit c set if words[i] has letter c at least k + 1 times,
+    and letters[i * word_size + j] is the code of letter j of words[i].
+    '''
+
+    def __init__(self, words, word_size=None):
+        self.words = words
+        if word_size is None:
+            word_size = len(words[0]) if words else 0
+        self.word_size = word_size
+        self.letters = array.array("B", "".join(words).encode("ascii", "replace").translate(LETTER_CODES))
+        self.masks = [array.array("I") for _ in range(NUM_COUNT_LEVELS)]
+        # Words with characters outside a-z, which are always checked exactly
+        self.irregular = []
+        for i, word in enumerate(words):
+            levels = [0] * NUM_COUNT_LEVELS
+            for code in self.letters[i * word_size:(i + 1) * word_size]:
+                if code == OTHER_CHARACTER:
+                    continue
+                bit = 1 << code
+                for level in range(NUM_COUNT_LEVELS):
+                    if not levels[level] & bit:
+                        levels[level] |= bit
+                        break
+            for level in range(NUM_COUNT_LEVELS):
+                self.masks[level].append(levels[level])
+            if OTHER_CHARACTER in self.letters[i * word_size:(i + 1) * word_size]:
+                self.irregular.append(i)
+
+    def __len__(self):
+        return len(self.words)
+
+    def filter(self, constraints, indices=None):
+        '''
+        Returns the indices of the words consistent with constraints, of every
+        word or only of those in the sorted list indices
+        '''
+        positions, required, forbidden, exact = constraint_masks(constraints)
+        if np is not None:
+            matches = self.filter_vectorized(positions, required, forbidden, indices)
+        else:
+            matches = self.filter_python(positions, required, forbidden, indices)
+        if exact:
+            # Counts beyond the masks need the exact check
+            matches = [i for i in matches if constraints.allows(self.words[i])]
+        elif self.irregular:
+            # So do words with characters outside a-z
+            irregular = set(self.irregular)
+            matches = [i for i in matches if i not in irregular or constraints.allows(self.words[i])]
+        return matches
+
+    def filter_words(self, constraints):
+        ''' Returns the words consistent with constraints, in order '''
+        return [self.words[i] for i in self.filter(constraints)]
+
+    def filter_vectorized(self, positions, required, forbidden, indices):
+        letters = np.frombuffer(self.letters, dtype=np.uint8).reshape(len(self.words), self.word_size)
+        if indices is not None:
+            indices = np.asarray(indices, dtype=np.intp)
+            letters = letters[indices]
+        ok = np.ones(len(letters), dtype=bool)
+        for level in range(NUM_COUNT_LEVELS):
+            if required[level] or forbidden[level]:
+                masks = np.frombuffer(self.masks[level], dtype=np.uint32)
+                if indices is not None:
+                    masks = masks[indices]
+                if required[level]:
+                    ok &= (masks & required[level]) == required[level]
+                if forbidden[level]:
+                    ok &= (masks & forbidden[level]) == 0
+        for j, allowed in enumerate(positions):
+            if allowed != ALL_LETTERS:
+                # Lookup of whether each letter code is allowed here; other characters pass to the exact check
+                lookup = np.array([(allowed >> code) & 1 for code in range(ALPHABET_SIZE)] + [1], dtype=bool)
+                ok &= lookup[letters[:, j]]
+        matches = np.flatnonzero(ok)
+        if indices is not None:
+            matches = indices[matches]
+        return matches.tolist()
+
+    def filter_python(self, positions, required, forbidden, indices):
+        checked_positions = [(j, allowed | (1 << OTHER_CHARACTER)) for j, allowed in enumerate(positions)
+                             if allowed != ALL_LETTERS]
+        checked_levels = [(self.masks[level], required[level], forbidden[level])
+                          for level in range(NUM_COUNT_LEVELS) if required[level] or forbidden[level]]
+        letters = self.letters
+        word_size = self.word_size
+        matches = []
+        for i in (range(len(self.words)) if indices is None else indices):
+            # Masks first, they reject most words with one test
+            for masks, need, forbid in checked_levels:
+                mask = masks[i]
+                if mask & need != need or mask & forbid:
+                    break
+            else:
+                start = i * word_size
+                for j, allowed in checked_positions:
+                    if not (allowed >> letters[start + j]) & 1:
+                        break
+                else:
+                    matches.append(i)
+        return matches
+
+
+class PositionIndex:
+    '''
+    Posting sets of a list of words by position. Bit i of postings[j][letter]
+    is set if letter j of words[i] is letter. Sets of words are passed around
+    as int bitsets, with bit i standing for words[i].
+    '''
+
+    def __init__(self, words, word_size=None):
+        self.words = words
+        if word_size is None:
+            word_size = len(words[0]) if words else 0
+        self.word_size = word_size
+        # Word ids first, then one bitset per posting list
+        ids = [{} for _ in range(word_size)]
+        for i, word in enumerate(words):
+            for j, letter in enumerate(word):
+                ids[j].setdefault(letter, []).append(i)
+        self.postings = [{letter: self.bits(word_ids) for letter, word_ids in position.items()}
+                         for position in ids]
+        self.all = (1 << len(words)) - 1
+
+    def __len__(self):
+        return len(self.words)
+
+    @staticmethod
+    def bits(indices):
+        ''' Returns the bitset of a list of word ids '''
+        bits = bytearray((max(indices) >> 3) + 1 if indices else 0)
+        for i in indices:
+            bits[i >> 3] |= 1 << (i & 7)
+        return int.from_bytes(bits, "little")
+
+    def prefix(self, prefix, within=None):
+        ''' Returns the bitset of the words, of every word or only of those in within, starting with prefix '''
+        bits = self.all if within is None else within
+        for j, letter in enumerate(prefix[:self.word_size]):
+            if not bits:
+                break
+            bits &= self.postings[j].get(letter, 0)
+        return bits
+
+    def indices(self, bits, limit=None):
+        ''' Returns the ids in a bitset in order, only the first limit of them if limit is given '''
+        indices = []
+        while bits and (limit is None or len(indices) < limit):
+            low = bits & -bits
+            indices.append(low.bit_length() - 1)
+            bits ^= low
+        return indices
+
+    def words_of(self, bits, limit=None):
+        return [self.words[i] for i in self.indices(bits, limit)]
+
+
+def constraint_masks(constraints):
+    '''
+    Returns (allowed letters per position, letters required per count level,
+    letters forbidden per count level, whether an exact check is needed) as
+    26 bit masks for a HardModeConstraints
+    '''
+    positions = [ALL_LETTERS if allowed == ANY_LETTER else (allowed >> FIRST_LETTER) & ALL_LETTERS
+                 for allowed in constraints.allowed]
+    required = [0] * NUM_COUNT_LEVELS
+    forbidden = [0] * NUM_COUNT_LEVELS
+    exact = False
+    for letter, count in constraints.min_counts.items():
+        if not letter_bit(letter):
+            exact = True  # not a letter the masks hold
+            continue
+        if count > NUM_COUNT_LEVELS:
+            exact = True
+            count = NUM_COUNT_LEVELS
+        if count > 0:
+            # Masks are nested, so having the letter count times implies every lower level
+            required[count - 1] |= letter_bit(letter)
+    for letter, count in constraints.max_counts.items():
+        if not letter_bit(letter):
+            exact = True
+        elif count < NUM_COUNT_LEVELS:
+            forbidden[count] |= letter_bit(letter)
+        else:
+            exact = True
+    return positions, required, forbidden, exact
+
+
+def letter_bit(letter):
+    code = ord(letter) - FIRST_LETTER
+    return 1 << code if 0 <= code < ALPHABET_SIZE else 0
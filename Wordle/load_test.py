@@ -0,0 +1,79 @@
+"""
+Description: Load test client for the Wordy game server. Opens a number
+of concurrent connections that each play games with random valid guesses
+and reports the throughput and latency percentiles of every request type.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from server import HOST, PORT
+from wordlists import get_word_list, LONG_WORDLIST_FILENAME
+
+PERCENTILES = (50, 90, 99, 99.9)
+
+
+async def request(reader, writer, latencies, message):
+    start = time.perf_counter()
+    writer.write(json.dumps(message).encode() + b"\n")
+    await writer.drain()
+    reply = json.loads(await reader.readline())
+    latencies.setdefault(message["op"], []).append(time.perf_counter() - start)
+    return reply
+
+
+async def play(host, port, games, word_size, guesses, rng, latencies):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for _ in range(games):
+            reply = await request(reader, writer, latencies, {"op": "start", "word_size": word_size})
+            session = reply["session"]
+            over = False
+            while not over:
+                reply = await request(reader, writer, latencies,
+                                      {"op": "guess", "session": session, "word": rng.choice(guesses)})
+                over = reply["over"]
+            await request(reader, writer, latencies, {"op": "end", "session": session})
+    finally:
+        writer.close()
+
+
+def percentile(values, percent):
+    ''' Nearest rank percentile of a sorted list '''
+    index = max(0, min(len(values) - 1, int(round(percent / 100 * len(values) + 0.5)) - 1))
+    return values[index]
+
+
+async def run(host, port, clients, games, word_size, seed):
+    guesses = get_word_list(LONG_WORDLIST_FILENAME).words(word_size)
+    latencies = {}
+    start = time.perf_counter()
+    await asyncio.gather(*(play(host, port, games, word_size, guesses, random.Random(seed + i), latencies)
+                           for i in range(clients)))
+    elapsed = time.perf_counter() - start
+
+    total = sum(len(values) for values in latencies.values())
+    print(f"{total} requests from {clients} clients in {elapsed:.2f}s ({total / elapsed:,.0f} req/s)")
+    for op, values in sorted(latencies.items()):
+        values.sort()
+        columns = " ".join(f"p{p}={percentile(values, p) * 1000:.2f}ms" for p in PERCENTILES)
+        print(f"{op:<6} n={len(values):<7} {columns} max={values[-1] * 1000:.2f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the Wordy game server")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--clients", type=int, default=100, help="concurrent connections")
+    parser.add_argument("--games", type=int, default=10, help="games played by each client")
+    parser.add_argument("--word-size", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    asyncio.run(run(args.host, args.port, args.clients, args.games, args.word_size, args.seed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+Description: Remaining possible answers for Wordy's answers panel. The
+answers consistent with the feedback of every board are kept as a
+letterindex.PositionIndex bitset, narrowed with a LetterIndex after each
+guess, so matching them to the letters typed on the current row is one
+AND per letter and can run on every keystroke.
+"""
+
+from constraints import HardModeConstraints
+from letterindex import LetterIndex, PositionIndex
+
+
+class RemainingAnswers:
+    '''
+    Answers still consistent with the feedback on each board of one game.
+    Call add() with the styles of every guess on every board it was scored on.
+    '''
+
+    def __init__(self, answers, word_size, num_boards=1):
+        self.word_size = word_size
+        self.positions = PositionIndex(answers, word_size)
+        self.letters = LetterIndex(answers, word_size)
+        self.reset(num_boards)
+
+    def reset(self, num_boards=1):
+        ''' Starts a game of num_boards boards, with every answer possible on each '''
+        self.constraints = [HardModeConstraints(self.word_size) for _ in range(num_boards)]
+        self.candidates = [None] * num_boards  # sorted answer ids, None while every answer is possible
+        self.consistent = [self.positions.all] * num_boards  # the same as a bitset
+
+    def add(self, guess, styles, board=0):
+        ''' Keeps the answers of board that would have given styles for guess '''
+        constraints = self.constraints[board]
+        constraints.add(guess, styles)
+        self.candidates[board] = self.letters.filter(constraints, self.candidates[board])
+        self.consistent[board] = self.positions.bits(self.candidates[board])
+
+    def matching(self, prefix="", board=0):
+        ''' Bitset of the answers of board that are consistent so far and start with prefix '''
+        return self.positions.prefix(prefix, self.consistent[board])
+
+    def count(self, bits):
+        return bin(bits).count("1")  # int.bit_count needs Python 3.10
+
+    def words(self, bits, limit=None):
+        ''' The answers in a bitset, in word list order '''
+        return self.positions.words_of(bits, limit)
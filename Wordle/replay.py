@@ -0,0 +1,136 @@
+"""
+Description: Game log and replay for Wordy. GameLog appends one JSON line
+per event (a "game" record with the hidden word and settings, a "guess"
+record with each guess and its styles, an "end" record with the result)
+through a buffered file. Replaying a log feeds every game back through
+game.GameState headlessly and reports any guess whose styles differ from
+the logged ones, so old logs double as a regression corpus for scoring.
+
+Run this file with one or more log files to replay them.
+"""
+
+import argparse
+import json
+import random
+import secrets
+import time
+
+from game import GameState, GameError, shared_words
+
+LOG_BUFFER_SIZE = 64 * 1024
+
+
+def game_seed(rng):
+    ''' Draws the seed a game uses to pick its hidden word '''
+    return rng.randrange(2 ** 32)
+
+
+def choose_word(seed, answers):
+    ''' Picks the hidden word for a game seed, the same way every time '''
+    return random.Random(seed).choice(answers)
+
+
+class GameLog:
+    ''' Append only log of games, written through a buffer and flushed at the end of every game '''
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.file = open(filename, "a", buffering=LOG_BUFFER_SIZE)
+
+    def write(self, record):
+        self.file.write(json.dumps(record, separators=(",", ":")) + "\n")
+
+    def start_game(self, hidden_word, word_size, num_guesses, hard_mode, guesses_must_be_words,
+                   seed=None, game_id=None, evil=False):
+        ''' Logs the start of a game and returns its id '''
+        if game_id is None:
+            game_id = secrets.token_hex(8)
+        self.write({"type": "game", "game": game_id, "time": time.time(), "hidden_word": hidden_word,
+                    "word_size": word_size, "num_guesses": num_guesses, "hard_mode": hard_mode,
+                    "guesses_must_be_words": guesses_must_be_words, "seed": seed, "evil": evil})
+        return game_id
+
+    def guess(self, game_id, word, styles):
+        self.write({"type": "guess", "game": game_id, "word": word, "styles": list(styles)})
+
+    def end_game(self, game_id, won):
+        self.write({"type": "end", "game": game_id, "won": won})
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+def read_games(filename):
+    ''' Yields (game record, [guess records]) for every game in a log file, in start order '''
+    games = {}
+    with open(filename, "r") as file:
+        for line in file:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if record["type"] == "game":
+                games[record["game"]] = (record, [])
+            elif record["type"] == "guess" and record["game"] in games:
+                games[record["game"]][1].append(record)
+    return games.values()
+
+
+def replay_game(game, guesses):
+    ''' Replays one logged game and returns a list of messages for every difference found '''
+    problems = []
+    words = shared_words(game["word_size"])
+    state = GameState(words, game["num_guesses"], game["hard_mode"], game["guesses_must_be_words"],
+                      game.get("evil", False))
+    if game.get("seed") is not None and words.answers:
+        if choose_word(game["seed"], words.answers) != game["hidden_word"]:
+            problems.append(f"seed {game['seed']} no longer picks {game['hidden_word']}")
+    try:
+        state.start(game["hidden_word"])
+    except GameError as error:
+        return problems + [f"start failed: {error}"]
+
+    for record in guesses:
+        try:
+            styles = list(state.guess(record["word"]))
+        except GameError as error:
+            problems.append(f"{record['word']} rejected: {error}")
+            continue
+        if styles != record["styles"]:
+            problems.append(f"{record['word']} scored {styles}, logged {record['styles']}")
+    return problems
+
+
+def replay(filenames):
+    ''' Replays every game in the log files and returns (games, guesses, {game id: problems}) '''
+    num_games = 0
+    num_guesses = 0
+    failures = {}
+    for filename in filenames:
+        for game, guesses in read_games(filename):
+            num_games += 1
+            num_guesses += len(guesses)
+            problems = replay_game(game, guesses)
+            if problems:
+                failures[game["game"]] = problems
+    return num_games, num_guesses, failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay Wordy game logs through the scoring rules")
+    parser.add_argument("logs", nargs="+", help="log files written by GameLog")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    num_games, num_guesses, failures = replay(args.logs)
+    elapsed = time.perf_counter() - start
+    for game_id, problems in failures.items():
+        for problem in problems:
+            print(f"{game_id}: {problem}")
+    print(f"Replayed {num_games} games, {num_guesses} guesses in {elapsed:.2f}s, "
+          f"{len(failures)} with differences")
+    raise SystemExit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
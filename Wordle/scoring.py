@@ -0,0 +1,120 @@
+"""
+Description: Headless scoring engine for Wordy. Computes the
+green/orange/grey feedback for a guess without touching any tkinter
+state, so solvers and analysis scripts can score words without a display.
+"""
+
+# Letter styles, using the same numbering as Wordy.Color_Guess_Frame
+CORRECT_RIGHT_LOC = 1  # green: letter is in the word and in the right spot
+CORRECT_WRONG_LOC = 2  # orange: letter is in the word but in another spot
+WRONG = 3  # grey: letter is not (or no longer) in the word
+
+# Base-3 digit of every style in an encoded pattern. A 5 letter pattern
+# encodes to a number below 3**5 = 243, so it fits in a single byte.
+PATTERN_DIGITS = {WRONG: 0, CORRECT_WRONG_LOC: 1, CORRECT_RIGHT_LOC: 2}
+DIGIT_STYLES = (WRONG, CORRECT_WRONG_LOC, CORRECT_RIGHT_LOC)
+
+
+def score_guess(guess, answer):
+    '''
+    Returns a tuple with the style of every letter of guess when answer is the hidden word
+    '''
+    if len(guess) != len(answer):
+        raise ValueError(
+            f"Guess '{guess}' and answer '{answer}' have different lengths")
+    styles = [WRONG] * len(guess)
+    letter_instances = letter_instance_init(answer)
+    letter_count = letter_counter(answer)
+    remaining = answer
+    unchecked_indeces = []
+
+    # First pass: letters in the right spot use up one instance of the letter
+    for i in range(len(guess)):
+        if guess[i] == answer[i]:
+            styles[i] = CORRECT_RIGHT_LOC
+            letter_instances[guess[i]] += 1
+            remaining = replace(remaining, "#", i)
+        else:
+            unchecked_indeces.append(i)
+
+    # Second pass: letters in the wrong spot, while instances are left
+    for i in unchecked_indeces:
+        letter = guess[i]
+        if letter in remaining and letter_instances[letter] < letter_count[letter]:
+            styles[i] = CORRECT_WRONG_LOC
+            letter_instances[letter] += 1
+    return tuple(styles)
+
+
+def score_batch(pairs):
+    '''
+    Scores every (guess, answer) pair in pairs and returns the list of styles
+    '''
+    return [score_guess(guess, answer) for guess, answer in pairs]
+
+
+def score_against(guess, answers):
+    '''
+    Scores one guess against every word in answers and returns the list of styles
+    '''
+    return [score_guess(guess, answer) for answer in answers]
+
+
+def encode_pattern(styles):
+    ''' Encodes a tuple of styles as a base-3 number, first letter most significant '''
+    code = 0
+    for style in styles:
+        code = code * 3 + PATTERN_DIGITS[style]
+    return code
+
+
+def decode_pattern(code, word_size):
+    ''' Turns a number made by encode_pattern back into a tuple of styles '''
+    styles = [WRONG] * word_size
+    for i in range(word_size - 1, -1, -1):
+        code, digit = divmod(code, 3)
+        styles[i] = DIGIT_STYLES[digit]
+    return tuple(styles)
+
+
+def solved_code(word_size):
+    ''' Returns the encoded pattern of a guess with every letter in the right spot '''
+    return 3 ** word_size - 1
+
+
+def is_solved(styles):
+    ''' Returns True if every letter of the pattern is in the right spot '''
+    return all(style == CORRECT_RIGHT_LOC for style in styles)
+
+
+def replace(s, ch, index):
+    ret_s = ""
+    if index > (len(s)+1):
+        raise BadReplacementIndexError
+    else:
+        for i in range(len(s)):
+            if i != index:
+                ret_s += s[i]
+            else:
+                ret_s += ch
+    return ret_s
+
+
+def letter_counter(s):
+    count_dict = {}
+    for ch in s:
+        if ch not in count_dict:
+            count_dict[ch] = s.count(ch)
+    return count_dict
+
+
+def letter_instance_init(s):
+    instance_dict = {}
+    for ch in s:
+        if ch not in instance_dict:
+            instance_dict[ch] = 0
+    return instance_dict
+
+
+class BadReplacementIndexError(Exception):
+    pass
@@ -0,0 +1,224 @@
+"""
+Description: Asyncio game server for Wordy. Hosts many concurrent games
+over a local TCP socket speaking newline delimited JSON. Every request is
+one object with an "op" of "start", "guess", "state" or "end", and every
+reply is one object with "ok" set, plus "error" when the request failed.
+
+    {"op": "start", "word_size": 5, "hard_mode": false, "evil": false}
+    {"op": "start", "daily": true}
+    {"op": "guess", "session": "...", "word": "crane"}
+
+Each session is a game.GameState, and all sessions of one word size share
+the same game.SharedWords word lists and feedback table. Any word size can
+be played; the least recently used sizes are dropped from memory. A start
+with "daily" set plays today's puzzle of daily.py instead of a random word,
+for the word sizes whose difficulty index was built by preload() or daily.py.
+Likewise evil mode is only played at the word sizes whose feedback table
+is preloaded or already in the cache, never building one for a request.
+"""
+
+import argparse
+import asyncio
+import datetime
+import json
+import random
+import secrets
+import time
+
+from daily import get_schedule, ensure_difficulty, NoDailyPuzzleError
+from feedback_table import CorruptTableError
+from game import GameState, GameError, shared_words, NUM_GUESSES
+from replay import GameLog, game_seed, choose_word
+
+HOST = "127.0.0.1"
+PORT = 8120
+SESSION_TIMEOUT = 30 * 60  # seconds a session may be idle before it is dropped
+MAX_SESSIONS = 100000
+EXPIRE_INTERVAL = 60  # seconds between sweeps for idle sessions
+MAX_WORD_SIZE = 32  # largest word_size a start request may ask for
+MAX_NUM_GUESSES = 100  # largest num_guesses a start request may ask for
+PRELOAD_WORD_SIZES = (5,)  # word sizes whose feedback table and daily schedule are loaded, or built, at startup
+
+
+def int_field(request, name, default, minimum, maximum):
+    ''' Returns an integer field of a request, raising GameError unless it is a whole number in range '''
+    value = request.get(name, default)
+    # bool is a subclass of int, but true is not a word size
+    if isinstance(value, bool) or not isinstance(value, int) or not minimum <= value <= maximum:
+        raise GameError(f"{name} must be a whole number from {minimum} to {maximum}")
+    return value
+
+
+def bool_field(request, name, default):
+    ''' Returns a true/false field of a request, raising GameError unless it is a JSON boolean '''
+    value = request.get(name, default)
+    # bool("false") is True, so strings and numbers are not taken as flags
+    if not isinstance(value, bool):
+        raise GameError(f"{name} must be true or false")
+    return value
+
+
+class GameServer:
+    def __init__(self, session_timeout=SESSION_TIMEOUT, max_sessions=MAX_SESSIONS, game_log=None, seed=None):
+        self.session_timeout = session_timeout
+        self.max_sessions = max_sessions
+        self.game_log = game_log  # replay.GameLog every game is written to, if any
+        self.rng = random.Random(seed)
+        self.sessions = {}  # session id -> GameState
+        self.last_active = {}  # session id -> time of the last request
+        # SharedWords of the preloaded sizes. shared_words() only keeps the most
+        # recently used sizes, so these are held here to never be evicted.
+        self.preloaded = {}
+
+    def preload(self, word_sizes=PRELOAD_WORD_SIZES):
+        ''' Loads the word lists, feedback tables and daily schedules before serving, so no request pays for them '''
+        for word_size in word_sizes:
+            words = self.preloaded[word_size] = shared_words(word_size).load_table()
+            if words.answers:
+                ensure_difficulty(word_size)
+                get_schedule(word_size)
+
+    def words(self, word_size):
+        ''' SharedWords of a word size, the preloaded one if there is one '''
+        words = self.preloaded.get(word_size)
+        return words if words is not None else shared_words(word_size)
+
+    def session(self, request):
+        session_id = request.get("session")
+        if not isinstance(session_id, str):
+            raise GameError("session must be a string")
+        state = self.sessions.get(session_id)
+        if state is None:
+            raise GameError("Unknown session")
+        self.last_active[session_id] = time.monotonic()
+        return session_id, state
+
+    def handle(self, request):
+        ''' Runs one request and returns the reply '''
+        op = request.get("op")
+        try:
+            if op == "start":
+                if len(self.sessions) >= self.max_sessions:
+                    raise GameError("Too many sessions")
+                word_size = int_field(request, "word_size", 5, 1, MAX_WORD_SIZE)
+                num_guesses = int_field(request, "num_guesses", NUM_GUESSES, 1, MAX_NUM_GUESSES)
+                word = request.get("word")
+                if word is not None and not isinstance(word, str):
+                    raise GameError("word must be a string")
+                state = GameState(self.words(word_size), num_guesses,
+                                  bool_field(request, "hard_mode", False),
+                                  bool_field(request, "guesses_must_be_words", True),
+                                  bool_field(request, "evil", False))
+                seed = None
+                if word is None and bool_field(request, "daily", False):
+                    try:
+                        word = get_schedule(state.word_size).word(datetime.date.today())
+                    except NoDailyPuzzleError as error:
+                        raise GameError(str(error)) from None
+                    except CorruptTableError:
+                        # The message names a local file, clients only need to know there is no puzzle
+                        raise GameError(f"The daily puzzle index of length {state.word_size} needs rebuilding") from None
+                elif word is None and state.words.answers:
+                    seed = game_seed(self.rng)
+                    word = choose_word(seed, state.words.answers)
+                state.start(word)
+                session_id = secrets.token_hex(8)
+                self.sessions[session_id] = state
+                self.last_active[session_id] = time.monotonic()
+                if self.game_log is not None:
+                    self.game_log.start_game(state.hidden_word, state.word_size, state.num_guesses,
+                                             state.hard_mode, state.guesses_must_be_words, seed, session_id,
+                                             state.evil)
+                return {"ok": True, "session": session_id, "state": state.to_dict()}
+            elif op == "guess":
+                session_id, state = self.session(request)
+                styles = state.guess(str(request.get("word", "")))
+                if self.game_log is not None:
+                    self.game_log.guess(session_id, state.guesses[-1][0], styles)
+                    if state.over:
+                        self.game_log.end_game(session_id, state.won)
+                return {"ok": True, "styles": list(styles), "over": state.over, "won": state.won,
+                        "message": state.message(), "state": state.to_dict()}
+            elif op == "state":
+                _, state = self.session(request)
+                return {"ok": True, "state": state.to_dict()}
+            elif op == "end":
+                session_id, _ = self.session(request)
+                del self.sessions[session_id]
+                del self.last_active[session_id]
+                return {"ok": True}
+            raise GameError(f"Unknown op {op}")
+        except (GameError, ValueError, TypeError) as error:
+            return {"ok": False, "error": str(error)}
+
+    def expire_sessions(self):
+        ''' Drops sessions that have been idle for longer than session_timeout '''
+        cutoff = time.monotonic() - self.session_timeout
+        for session_id in [sid for sid, last in self.last_active.items() if last < cutoff]:
+            del self.sessions[session_id]
+            del self.last_active[session_id]
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (ValueError, asyncio.LimitOverrunError):
+                    # The rest of the line may still be unread, so the stream cannot be trusted to
+                    # be at the start of a request any more. Reply and drop the connection.
+                    writer.write(json.dumps({"ok": False, "error": "Request is too long"}).encode() + b"\n")
+                    await writer.drain()
+                    break
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                    reply = self.handle(request) if isinstance(request, dict) else \
+                        {"ok": False, "error": "Request must be an object"}
+                except ValueError:
+                    reply = {"ok": False, "error": "Request is not valid JSON"}
+                writer.write(json.dumps(reply).encode() + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def expire_loop(self):
+        while True:
+            await asyncio.sleep(EXPIRE_INTERVAL)
+            self.expire_sessions()
+
+    async def serve(self, host=HOST, port=PORT):
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        expire_task = asyncio.create_task(self.expire_loop())
+        print(f"Serving Wordy on {host}:{port}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            expire_task.cancel()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve Wordy games over a local socket")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--log", help="append every game to this log file for replay.py")
+    parser.add_argument("--seed", type=int, help="seed for the hidden words")
+    args = parser.parse_args()
+
+    game_log = GameLog(args.log) if args.log else None
+    server = GameServer(game_log=game_log, seed=args.seed)
+    server.preload()
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if game_log is not None:
+            game_log.close()
+
+
+if __name__ == "__main__":
+    main()
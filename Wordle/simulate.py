@@ -0,0 +1,162 @@
+"""
+Description: Headless bulk game simulator for Wordy. Plays a full game,
+NUM_GUESSES turns at most, for every answer in the short word list with
+a pluggable guessing strategy, spreading the games over a process pool,
+and reports the solve rate and the distribution of guesses used.
+
+Hard mode uses the same constraints.HardModeConstraints check as the game.
+A strategy is a class taking the word size, with reset(), update(guess,
+styles) and best_guess(hard_mode) methods, like solver.Solver. Only the
+"tree" strategy uses the decision trees saved by decision_tree.py.
+"""
+
+import argparse
+import os
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import decision_tree
+import feedback_table
+from constraints import HardModeConstraints
+from scoring import score_guess
+from solver import Solver
+from wordlists import get_word_list, SHORT_WORDLIST_FILENAME
+
+NUM_GUESSES = 6
+CHUNK_SIZE = 64
+
+# Strategy of the current worker process, created by init_worker
+_strategy = None
+
+
+class EntropyStrategy(Solver):
+    '''
+    Ranks guesses by entropy on every turn. Saved decision trees are
+    ignored, so the results only depend on the word lists, not on which
+    trees happen to be in the cache.
+    '''
+
+    def __init__(self, word_size=5, table=None):
+        super().__init__(word_size, table, trees={})
+
+
+class TreeStrategy(Solver):
+    '''
+    The precomputed policy: follows the decision trees saved by
+    decision_tree.py, and ranks by entropy once a game leaves them.
+    '''
+
+    def __init__(self, word_size=5, table=None):
+        super().__init__(word_size, table, trees=None)
+
+
+class CandidateStrategy(Solver):
+    '''
+    Baseline strategy that always guesses the first answer still consistent
+    with the feedback, without looking at information.
+    '''
+
+    def __init__(self, word_size=5, table=None):
+        super().__init__(word_size, table, trees={})
+
+    def rank(self, limit=10, hard_mode=False):
+        return [(word, 0.0) for word in self.candidate_words()[:limit]]
+
+
+STRATEGIES = {"entropy": EntropyStrategy, "tree": TreeStrategy, "candidate": CandidateStrategy}
+
+
+def play_game(strategy, answer, hard_mode=False, num_guesses=NUM_GUESSES):
+    ''' Plays one game and returns the number of guesses used, or None if it was not solved '''
+    strategy.reset()
+    constraints = HardModeConstraints(len(answer))
+    for turn in range(1, num_guesses + 1):
+        guess = strategy.best_guess(hard_mode)
+        if guess is None:
+            return None
+        if hard_mode and not constraints.allows(guess):
+            raise InvalidGuessError(f"{guess} breaks hard mode: {constraints.violation(guess)}")
+        if guess == answer:
+            return turn
+        styles = score_guess(guess, answer)
+        strategy.update(guess, styles)
+        constraints.add(guess, styles)
+    return None
+
+
+def init_worker(strategy_class, word_size):
+    global _strategy
+    _strategy = strategy_class(word_size)
+
+
+def play_chunk(answers, hard_mode, num_guesses):
+    return [play_game(_strategy, answer, hard_mode, num_guesses) for answer in answers]
+
+
+def simulate(strategy_class=Solver, answers=None, word_size=5, hard_mode=False,
+             num_guesses=NUM_GUESSES, workers=None, chunk_size=CHUNK_SIZE):
+    '''
+    Plays a game for every answer (every short list word of word_size by default)
+    on a process pool and returns a dict mapping each answer to its guess count,
+    None for games that were not solved
+    '''
+    if answers is None:
+        answers = get_word_list(SHORT_WORDLIST_FILENAME).words(word_size)
+    answers = list(answers)
+    chunks = [answers[i:i + chunk_size] for i in range(0, len(answers), chunk_size)]
+    results = {}
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                             initargs=(strategy_class, word_size)) as executor:
+        futures = [executor.submit(play_chunk, chunk, hard_mode, num_guesses) for chunk in chunks]
+        for chunk, future in zip(chunks, futures):
+            results.update(zip(chunk, future.result()))
+    return results
+
+
+def summarize(results):
+    ''' Returns the solve rate, mean guesses of solved games and guess count distribution '''
+    solved = [guesses for guesses in results.values() if guesses is not None]
+    distribution = Counter(solved)
+    distribution["failed"] = len(results) - len(solved)
+    return {
+        "games": len(results),
+        "solve_rate": len(solved) / len(results) if results else 0.0,
+        "mean_guesses": sum(solved) / len(solved) if solved else None,
+        "distribution": dict(distribution),
+    }
+
+
+class InvalidGuessError(Exception):
+    pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play Wordy for every answer and report the results")
+    parser.add_argument("--strategy", choices=sorted(STRATEGIES), default="entropy")
+    parser.add_argument("--word-size", type=int, default=5)
+    parser.add_argument("--guesses", type=int, default=NUM_GUESSES)
+    parser.add_argument("--hard", action="store_true", help="play in hard mode")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--limit", type=int, help="only play the first LIMIT answers")
+    args = parser.parse_args()
+
+    if args.strategy == "tree" and args.hard not in decision_tree.saved_trees(feedback_table.get_table(args.word_size)):
+        raise SystemExit(f"No {'hard' if args.hard else 'normal'} mode decision tree saved for words of length "
+                         f"{args.word_size}, build one with decision_tree.py")
+    answers = get_word_list(SHORT_WORDLIST_FILENAME).words(args.word_size)[:args.limit]
+    start = time.perf_counter()
+    results = simulate(STRATEGIES[args.strategy], answers, args.word_size, args.hard,
+                       args.guesses, args.workers)
+    summary = summarize(results)
+    print(f"Played {summary['games']} games in {time.perf_counter() - start:.1f}s")
+    print(f"Solve rate: {summary['solve_rate']:.2%}")
+    if summary["mean_guesses"] is not None:
+        print(f"Mean guesses: {summary['mean_guesses']:.3f}")
+    for guesses in range(1, args.guesses + 1):
+        print(f"{guesses}: {summary['distribution'].get(guesses, 0)}")
+    print(f"failed: {summary['distribution']['failed']}")
+
+
+if __name__ == "__main__":
+    main()
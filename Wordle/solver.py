@@ -0,0 +1,233 @@
+"""
+Description: Entropy solver and hint engine for Wordy. Keeps the answers
+that are still consistent with the feedback so far, narrowing them after
+every guess, and ranks guesses by the expected information (entropy) of
+the feedback they would produce. Scores come from the precomputed
+feedback table, so ranking is a table lookup rather than rescoring.
+When a decision tree has been saved for the word lists (see
+decision_tree.py), best_guess() follows it instead of ranking, for as
+long as the guesses made are the ones the tree gave. Words are filtered
+by the feedback so far through letterindex.LetterIndex.
+
+Run this file to build the feedback tables and first move rankings of
+the word sizes hints are wanted for. Wordy only loads them, as building
+them on a hint would freeze the window for seconds.
+"""
+
+import argparse
+import json
+import math
+import os
+from collections import Counter
+
+import decision_tree
+import feedback_table
+from constraints import HardModeConstraints
+from letterindex import LetterIndex
+from scoring import encode_pattern
+
+try:
+    import numpy as np
+except ImportError:  # numpy is not installed, rank with the pure Python path
+    np = None
+
+# First move rankings, keyed by feedback table file name. The first move
+# only depends on the word lists, so it is computed once and kept next to
+# the table on disk.
+_first_rankings = {}
+FIRST_RANKING_SIZE = 50
+ENTROPY_BLOCK_CELLS = 1 << 21  # cells of the largest temporary array when ranking with numpy
+
+
+class Solver:
+    '''
+    Tracks the candidate answers of one game. Call update() with every
+    guess and its styles, and rank() or best_guess() for a hint.
+    '''
+
+    def __init__(self, word_size=5, table=None, trees=None):
+        self.word_size = word_size
+        if table is None:
+            table = feedback_table.get_table(word_size)
+        self.table = table
+        if trees is None:
+            trees = decision_tree.saved_trees(table)
+        self.trees = trees  # hard mode -> DecisionTree
+        # Letter indexes of the guesses and answers, built the first time they are needed
+        self.guess_letters = None
+        self.answer_letters = None
+        self.constraints = HardModeConstraints(word_size)
+        self.matrix = None
+        if np is not None and len(table.guesses) and len(table.answers):
+            dtype = np.dtype(feedback_table.table_typecode(word_size))
+            self.matrix = np.frombuffer(table.data, dtype=dtype).reshape(
+                len(table.guesses), len(table.answers))
+        self.reset()
+
+    def reset(self):
+        ''' Forgets every guess, so all answers are candidates again '''
+        self.history = []
+        self.candidates = list(range(len(self.table.answers)))
+        self.constraints.reset()
+        # Current node of every tree, None once the game has left the tree
+        self.tree_nodes = {hard_mode: decision_tree.ROOT for hard_mode in self.trees}
+
+    def candidate_words(self):
+        ''' Returns the answers still consistent with every guess so far '''
+        return [self.table.answers[i] for i in self.candidates]
+
+    def patterns(self, guess):
+        ''' Returns the encoded pattern of guess, which must be in the table, against every current candidate '''
+        if self.matrix is not None:
+            return self.matrix[self.table.guess_index[guess], self.candidates].tolist()
+        row = self.table.row(guess)
+        return [row[i] for i in self.candidates]
+
+    def update(self, guess, styles):
+        ''' Keeps only the candidates that would have given styles for guess '''
+        self.constraints.add(guess, styles)
+        code = encode_pattern(styles)
+        if guess in self.table.guess_index:
+            patterns = self.patterns(guess)
+            self.candidates = [self.candidates[i] for i in range(len(patterns)) if patterns[i] == code]
+        else:
+            # Guess is not in the long word list, so it is not in the table
+            if self.answer_letters is None:
+                self.answer_letters = LetterIndex(self.table.answers, self.word_size)
+            self.candidates = self.answer_letters.filter(self.constraints, self.candidates)
+        self.history.append((guess, tuple(styles)))
+        for hard_mode, node in self.tree_nodes.items():
+            tree = self.trees[hard_mode]
+            if node is not None:
+                self.tree_nodes[hard_mode] = tree.child(node, code) if tree.guess(node) == guess else None
+
+    def rank(self, limit=10, hard_mode=False):
+        '''
+        Returns up to limit (guess, entropy) pairs, best first. In hard mode
+        only the guesses consistent with all feedback so far are ranked.
+        '''
+        if not self.candidates:
+            return []
+        if len(self.candidates) <= 2:
+            # Guessing a candidate can win now, which beats any information
+            return [(word, 0.0) for word in self.candidate_words()[:limit]]
+        if not self.history:
+            # Every guess is allowed on the first move, in hard mode too
+            return self.first_ranking()[:limit]
+
+        if hard_mode:
+            if self.guess_letters is None:
+                self.guess_letters = LetterIndex(self.table.guesses, self.word_size)
+            guesses = self.guess_letters.filter(self.constraints)
+        else:
+            guesses = list(range(len(self.table.guesses)))
+        entropies = self.entropies(guesses)
+        candidate_guesses = set(self.table.guess_index.get(word) for word in self.candidate_words())
+        # Prefer guesses that could also be the answer when entropies tie
+        order = sorted(range(len(guesses)),
+                       key=lambda i: (-entropies[i], guesses[i] not in candidate_guesses))
+        return [(self.table.guesses[guesses[i]], entropies[i]) for i in order[:limit]]
+
+    def best_guess(self, hard_mode=False):
+        ''' Returns the best guess, from the decision tree while the game follows it, or None if no answer is consistent '''
+        node = self.tree_nodes.get(hard_mode)
+        if node is not None:
+            return self.trees[hard_mode].guess(node)
+        ranking = self.rank(1, hard_mode)
+        return ranking[0][0] if ranking else None
+
+    def entropies(self, guesses, candidates=None):
+        ''' Expected information in bits of the feedback of every guess, given the candidates '''
+        if candidates is None:
+            candidates = self.candidates
+        total = len(candidates)
+        if self.matrix is not None:
+            # Guesses are ranked in blocks, so no temporary array has much more
+            # than ENTROPY_BLOCK_CELLS cells whatever the word size
+            block = max(1, ENTROPY_BLOCK_CELLS // max(total, 3 ** self.word_size))
+            entropies = []
+            for start in range(0, len(guesses), block):
+                entropies.extend(self.block_entropies(guesses[start:start + block], candidates))
+            return entropies
+
+        entropies = []
+        for g in guesses:
+            row = self.table.row(self.table.guesses[g])
+            counts = Counter(row[i] for i in candidates)
+            entropies.append(-sum(c / total * math.log2(c / total) for c in counts.values()))
+        return entropies
+
+    def block_entropies(self, guesses, candidates):
+        ''' Entropies of a block of guesses from the table matrix '''
+        total = len(candidates)
+        num_patterns = 3 ** self.word_size
+        sub = self.matrix[np.ix_(guesses, candidates)].astype(np.int64)
+        # Histogram every row at once by giving each row its own range of bins
+        sub += (np.arange(len(guesses)) * num_patterns)[:, None]
+        if total * 4 < num_patterns:
+            # Few candidates: sorting finds the size of every candidate's partition faster
+            # than histogramming every pattern. Each candidate in a partition of size c adds
+            # log2(c) / total, and the entropy is log2(total) less their sum.
+            flat = np.sort(sub.ravel())
+            sizes = np.searchsorted(flat, flat, "right") - np.searchsorted(flat, flat, "left")
+            logs = np.log2(sizes).reshape(len(guesses), total)
+            return (math.log2(total) - logs.sum(axis=1) / total).tolist()
+        counts = np.bincount(sub.ravel(), minlength=len(guesses) * num_patterns)
+        p = counts.reshape(len(guesses), num_patterns) / total
+        with np.errstate(divide="ignore", invalid="ignore"):
+            terms = np.where(p > 0, p * np.log2(p), 0.0)
+        return (-terms.sum(axis=1)).tolist()
+
+    def first_ranking(self):
+        ''' Ranking of the first move, loaded from the cache or computed and stored once '''
+        filename = None
+        if self.table.filename is not None:
+            filename = first_ranking_filename(self.table.filename)
+            ranking = _first_rankings.get(filename)
+            if ranking is not None:
+                return ranking
+            try:
+                with open(filename, "r") as file:
+                    ranking = [tuple(item) for item in json.load(file)]
+                _first_rankings[filename] = ranking
+                return ranking
+            except (FileNotFoundError, ValueError):
+                pass
+
+        guesses = list(range(len(self.table.guesses)))
+        entropies = self.entropies(guesses)
+        order = sorted(guesses, key=lambda g: -entropies[g])[:FIRST_RANKING_SIZE]
+        ranking = [(self.table.guesses[g], entropies[g]) for g in order]
+        if filename is not None:
+            with open(filename, "w") as file:
+                json.dump(ranking, file)
+            _first_rankings[filename] = ranking
+        return ranking
+
+
+def first_ranking_filename(table_filename):
+    ''' Path of the first move ranking cached next to a feedback table file '''
+    return os.path.splitext(table_filename)[0] + "_first.json"
+
+
+def hints_built(word_size):
+    '''
+    Whether the feedback table and first move ranking of a word size are in
+    the cache, so a Solver giving hints builds neither
+    '''
+    return (feedback_table.table_built(word_size) and
+            os.path.exists(first_ranking_filename(feedback_table.table_filename(word_size))))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the feedback tables and first move rankings for hints")
+    parser.add_argument("word_sizes", type=int, nargs="*", default=[5], help="word sizes to build, 5 by default")
+    args = parser.parse_args()
+
+    for word_size in args.word_sizes:
+        Solver(word_size, trees={}).first_ranking()
+        print(f"Built hints for words of length {word_size}")
+
+
+if __name__ == "__main__":
+    main()
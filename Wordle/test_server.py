@@ -0,0 +1,50 @@
+"""
+Description: Regression tests for server.GameServer request handling.
+Run from this directory with python -m pytest or python -m unittest.
+"""
+
+import unittest
+from unittest import mock
+
+import feedback_table
+from server import GameServer
+
+
+class MalformedStartTest(unittest.TestCase):
+    def test_malformed_start_gets_an_error_reply(self):
+        server = GameServer()
+        for request in ({"op": "start", "word": 5},
+                        {"op": "start", "word_size": None},
+                        {"op": "start", "word_size": "5"},
+                        {"op": "start", "num_guesses": []},
+                        {"op": "start", "num_guesses": 0},
+                        {"op": "start", "num_guesses": -1},
+                        {"op": "start", "hard_mode": "false"},
+                        {"op": "start", "evil": 0},
+                        {"op": "start", "daily": "no"}):
+            with self.subTest(request=request):
+                reply = server.handle(request)
+                self.assertFalse(reply["ok"])
+                self.assertIn("error", reply)
+        self.assertEqual(server.sessions, {})
+
+
+class EvilStartTest(unittest.TestCase):
+    def test_evil_start_never_builds_a_table(self):
+        server = GameServer()
+        with mock.patch.object(feedback_table, "table_built", return_value=False), \
+                mock.patch.object(feedback_table, "build_table") as build_table:
+            reply = server.handle({"op": "start", "evil": True, "word_size": 9})
+        self.assertFalse(reply["ok"])
+        self.assertIn("precomputed table", reply["error"])
+        build_table.assert_not_called()
+
+
+class SessionTest(unittest.TestCase):
+    def test_non_string_session_gets_an_error_reply(self):
+        reply = GameServer().handle({"op": "guess", "session": ["x"], "word": "crane"})
+        self.assertEqual(reply, {"ok": False, "error": "session must be a string"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+"""
+Description: NumPy scoring path for Wordy. Word lists are stored as
+(N, WORD_SIZE) uint8 letter arrays and a guess, or a block of guesses,
+is scored against every answer at once. Results are encoded patterns
+(see scoring.encode_pattern) and match scoring.score_guess exactly,
+including the green-first handling of repeated letters.
+"""
+
+import numpy as np
+
+# Block of guesses scored at a time by score_table, which bounds the
+# temporary (block, answers, word size) arrays to a few megabytes.
+SCORE_BLOCK_SIZE = 256
+
+
+def encode_words(words, word_size=None):
+    '''
+    Returns the words as an (N, word_size) uint8 array of letter codes,
+    where 'a' is 0 and 'z' is 25
+    '''
+    if word_size is None:
+        word_size = len(words[0]) if words else 0
+    letters = np.frombuffer("".join(words).encode("ascii"), dtype=np.uint8)
+    return (letters - ord("a")).astype(np.uint8).reshape(len(words), word_size)
+
+
+def pattern_dtype(word_size):
+    ''' Smallest unsigned dtype that can hold every pattern for the word size '''
+    if 3 ** word_size <= 2 ** 8:
+        return np.uint8
+    elif 3 ** word_size <= 2 ** 16:
+        return np.uint16
+    elif 3 ** word_size <= 2 ** 32:
+        return np.uint32
+    return np.uint64
+
+
+def score_block(guesses, answers):
+    '''
+    Scores an (M, L) block of encoded guesses against (N, L) encoded answers
+    and returns the (M, N) array of encoded patterns
+    '''
+    guesses = np.atleast_2d(guesses)
+    word_size = guesses.shape[1]
+    green = guesses[:, None, :] == answers[None, :, :]
+    orange = np.zeros_like(green)
+
+    for i in range(word_size):
+        letter = guesses[:, i][:, None, None]
+        # Instances of the letter in the answer that were not used up by a green
+        available = ((answers[None, :, :] == letter) & ~green).sum(axis=2)
+        # Instances already used up by oranges earlier in the guess
+        for k in range(i):
+            same_letter = (guesses[:, k] == guesses[:, i])[:, None]
+            available -= orange[:, :, k] & same_letter
+        orange[:, :, i] = ~green[:, :, i] & (available > 0)
+
+    codes = np.zeros(green.shape[:2], dtype=pattern_dtype(word_size))
+    for i in range(word_size):
+        digit = green[:, :, i] * 2 + orange[:, :, i]
+        codes = codes * 3 + digit.astype(codes.dtype)
+    return codes
+
+
+def score_against_all(guess, answers):
+    ''' Scores one encoded guess against (N, L) encoded answers, returning N patterns '''
+    return score_block(np.asarray(guess)[None, :], answers)[0]
+
+
+def score_table(guesses, answers, block_size=SCORE_BLOCK_SIZE):
+    ''' Returns the full (M, N) pattern table of encoded guesses against encoded answers '''
+    table = np.empty((len(guesses), len(answers)),
+                     dtype=pattern_dtype(guesses.shape[1]))
+    for start in range(0, len(guesses), block_size):
+        table[start:start + block_size] = score_block(
+            guesses[start:start + block_size], answers)
+    return table
@@ -0,0 +1,96 @@
+"""
+Description: Word list index for Wordy. Each word list file is read once
+per process, grouped by word length and kept in hashed sets, so checking
+a guess is a constant time lookup and every game instance shares the
+same lists no matter which WORD_SIZE it uses. If a word list has been
+compiled with wordpack.py, the packed file is memory-mapped instead of
+parsing the text file.
+"""
+
+import os
+from collections import OrderedDict
+
+import wordpack
+
+WORDLIST_DIR = os.path.dirname(os.path.abspath(__file__))
+LONG_WORDLIST_FILENAME = os.path.join(WORDLIST_DIR, "long_wordlist.txt")
+SHORT_WORDLIST_FILENAME = os.path.join(WORDLIST_DIR, "short_wordlist.txt")
+
+# Number of word sizes whose sets (and other per size structures) are
+# kept in memory at once. Sizes that have not been used lately are dropped
+# and rebuilt from the loaded words if they are needed again.
+WORD_SIZE_CACHE_SIZE = 4
+
+# Loaded word lists, keyed by absolute file name
+_word_lists = {}
+
+
+class SizeCache:
+    ''' Values built on first use for each word size, keeping only the most recently used ones '''
+
+    def __init__(self, build, max_size=WORD_SIZE_CACHE_SIZE):
+        self.build = build
+        self.max_size = max_size
+        self._values = OrderedDict()
+
+    def get(self, word_size):
+        value = self._values.get(word_size)
+        if value is None:
+            value = self.build(word_size)
+            self._values[word_size] = value
+            if len(self._values) > self.max_size:
+                self._values.popitem(last=False)
+        else:
+            self._values.move_to_end(word_size)
+        return value
+
+
+class WordList:
+    '''
+    Words of one word list file grouped by length. words() keeps the order
+    of the file, word_set() is used for membership checks.
+    '''
+
+    def __init__(self, words):
+        grouped = {}
+        for word in words:
+            grouped.setdefault(len(word), []).append(word)
+        self._words = {size: tuple(group) for size, group in grouped.items()}
+        self._sets = SizeCache(lambda size: frozenset(self.words(size)))
+
+    def words(self, word_size):
+        ''' Returns the words of the given size, in file order '''
+        return self._words.get(word_size, ())
+
+    def word_set(self, word_size):
+        ''' Returns the set of words of the given size '''
+        return self._sets.get(word_size)
+
+    def sizes(self):
+        ''' Returns the word sizes present in the list '''
+        return sorted(self._words)
+
+    def __contains__(self, word):
+        return len(word) in self._words and word in self.word_set(len(word))
+
+
+def read_words(filename):
+    ''' Returns every non empty line of a word list file '''
+    with open(filename, "r") as file:
+        return [word for word in (line.strip() for line in file) if word]
+
+
+def get_word_list(filename):
+    '''
+    Returns the WordList for a file, loading the file only the first time.
+    An up to date packed copy of the file is used when there is one.
+    '''
+    key = os.path.abspath(filename)
+    word_list = _word_lists.get(key)
+    if word_list is None:
+        if wordpack.is_up_to_date(key):
+            word_list = wordpack.PackedWordList(wordpack.pack_filename(key))
+        else:
+            word_list = WordList(read_words(key))
+        _word_lists[key] = word_list
+    return word_list
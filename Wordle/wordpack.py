@@ -0,0 +1,133 @@
+"""
+Description: Compact binary word list format for Wordy. A text word list
+is compiled once into a .pack file that stores, for every word length,
+the words as fixed width ASCII records one after another, plus a header
+with the offset of each length. Loading the words of one length is then
+a slice of a memory-mapped file instead of a parse of the whole list.
+
+Run this file to compile long_wordlist.txt and short_wordlist.txt.
+"""
+
+import mmap
+import os
+import struct
+import sys
+
+import wordlists
+
+PACK_MAGIC = b"WRDP"
+PACK_VERSION = 1
+# magic, version, number of lengths, size and mtime of the source text file
+HEADER_FORMAT = "<4sHHQq"
+# word length, padding, number of words, offset of the first word
+ENTRY_FORMAT = "<HHIQ"
+
+
+def pack_filename(text_filename):
+    ''' Returns the name of the compiled file for a text word list '''
+    return os.path.splitext(text_filename)[0] + ".pack"
+
+
+def compile_word_list(text_filename, packed_filename=None):
+    ''' Compiles a text word list into the packed format and returns the packed file name '''
+    if packed_filename is None:
+        packed_filename = pack_filename(text_filename)
+    grouped = {}
+    for word in wordlists.read_words(text_filename):
+        grouped.setdefault(len(word), []).append(word)
+
+    stat = os.stat(text_filename)
+    header = struct.pack(HEADER_FORMAT, PACK_MAGIC, PACK_VERSION,
+                         len(grouped), stat.st_size, stat.st_mtime_ns)
+    offset = len(header) + struct.calcsize(ENTRY_FORMAT) * len(grouped)
+    entries = []
+    records = []
+    for word_size in sorted(grouped):
+        words = grouped[word_size]
+        entries.append(struct.pack(ENTRY_FORMAT, word_size, 0, len(words), offset))
+        records.append("".join(words).encode("ascii"))
+        offset += len(records[-1])
+
+    temp_filename = f"{packed_filename}.{os.getpid()}.tmp"
+    with open(temp_filename, "wb") as file:
+        file.write(header)
+        file.write(b"".join(entries))
+        file.write(b"".join(records))
+    os.replace(temp_filename, packed_filename)
+    return packed_filename
+
+
+def is_up_to_date(text_filename, packed_filename=None):
+    ''' Returns True if the packed file exists and was compiled from the current text file '''
+    if packed_filename is None:
+        packed_filename = pack_filename(text_filename)
+    try:
+        with open(packed_filename, "rb") as file:
+            header = file.read(struct.calcsize(HEADER_FORMAT))
+        stat = os.stat(text_filename)
+    except FileNotFoundError:
+        return False
+    if len(header) != struct.calcsize(HEADER_FORMAT):
+        return False
+    magic, version, _, source_size, source_mtime = struct.unpack(HEADER_FORMAT, header)
+    return (magic == PACK_MAGIC and version == PACK_VERSION and
+            source_size == stat.st_size and source_mtime == stat.st_mtime_ns)
+
+
+class PackedWordList:
+    '''
+    Memory-mapped packed word list with the same interface as
+    wordlists.WordList. The words of a length are only decoded the first
+    time they are asked for.
+    '''
+
+    def __init__(self, packed_filename):
+        with open(packed_filename, "rb") as file:
+            self._mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, num_sizes, _, _ = struct.unpack_from(HEADER_FORMAT, self._mapped)
+        if magic != PACK_MAGIC or version != PACK_VERSION:
+            self._mapped.close()
+            raise BadPackError(f"{packed_filename} is not a packed word list")
+
+        self._entries = {}
+        entry_size = struct.calcsize(ENTRY_FORMAT)
+        for i in range(num_sizes):
+            word_size, _, count, offset = struct.unpack_from(
+                ENTRY_FORMAT, self._mapped, struct.calcsize(HEADER_FORMAT) + i * entry_size)
+            self._entries[word_size] = (count, offset)
+        self._words = wordlists.SizeCache(self.decode)
+        self._sets = wordlists.SizeCache(lambda size: frozenset(self.words(size)))
+
+    def raw(self, word_size):
+        ''' Returns the packed words of the given size as a read-only buffer '''
+        count, offset = self._entries.get(word_size, (0, 0))
+        return memoryview(self._mapped)[offset:offset + count * word_size]
+
+    def decode(self, word_size):
+        ''' Decodes the packed words of the given size into a tuple of strings '''
+        text = self.raw(word_size).tobytes().decode("ascii")
+        return tuple(text[i:i + word_size] for i in range(0, len(text), word_size))
+
+    def words(self, word_size):
+        ''' Returns the words of the given size, in file order '''
+        return self._words.get(word_size)
+
+    def word_set(self, word_size):
+        ''' Returns the set of words of the given size '''
+        return self._sets.get(word_size)
+
+    def sizes(self):
+        ''' Returns the word sizes present in the list '''
+        return sorted(self._entries)
+
+    def __contains__(self, word):
+        return len(word) in self._entries and word in self.word_set(len(word))
+
+
+class BadPackError(Exception):
+    pass
+
+
+if __name__ == "__main__":
+    for filename in sys.argv[1:] or [wordlists.LONG_WORDLIST_FILENAME, wordlists.SHORT_WORDLIST_FILENAME]:
+        print(f"Compiled {filename} into {compile_word_list(filename)}")